@@ -1,5 +1,5 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from selenium import webdriver 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -7,13 +7,2133 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+import urllib3
+import atexit
+import copy
+import json
+import os
+import threading
 import time
 import re
-from urllib.parse import quote_plus
+import queue
+import uuid
+from collections import OrderedDict, deque
+from contextlib import closing, contextmanager
+from urllib.parse import quote_plus, urlencode, urlparse
+from datetime import datetime, timezone
+import base64
+import gzip
+import html
+import logging
+import shutil
+import heapq
+import itertools
+import math
+import random
+import hashlib
+import sqlite3
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 
+# LOG_LEVEL=DEBUG adds a line per scraped item
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s [%(threadName)s] %(message)s'
+)
+logger = logging.getLogger('scraper')
+
+# Chrome and chromedriver locations (the Docker image sets both). Resolved once per
+# process; unset or missing paths fall back to a chromedriver on PATH, and only then
+# to a webdriver-manager download.
+CHROME_BIN = os.environ.get('CHROME_BIN', '')
+CHROMEDRIVER_PATH = os.environ.get('CHROMEDRIVER_PATH', '')
+
+# Launch a browser at startup so the first request does not wait for one. /ready
+# answers 200 once a browser has started, whether from the prewarm or a request.
+PREWARM_ON_START = os.environ.get('PREWARM_ON_START', 'true').lower() != 'false'
+PREWARM_PLATFORM = os.environ.get('PREWARM_PLATFORM', 'youtube')
+
+# Driver pool settings (per-platform warm counts are the number of browsers
+# kept launched and idle for that platform)
+DRIVER_POOL_SIZE = int(os.environ.get('DRIVER_POOL_SIZE', 2))
+DRIVER_POOL_WARM = {
+    'twitter': int(os.environ.get('DRIVER_POOL_WARM_TWITTER', 0)),
+    'youtube': int(os.environ.get('DRIVER_POOL_WARM_YOUTUBE', 0)),
+}
+DRIVER_MAX_USES = int(os.environ.get('DRIVER_MAX_USES', 50))
+DRIVER_MAX_MEMORY_MB = int(os.environ.get('DRIVER_MAX_MEMORY_MB', 512))
+DRIVER_CHECKOUT_TIMEOUT = float(os.environ.get('DRIVER_CHECKOUT_TIMEOUT', 60))
+# Longest a page navigation may take; a request deadline shortens it further
+DRIVER_PAGE_LOAD_TIMEOUT = float(os.environ.get('DRIVER_PAGE_LOAD_TIMEOUT', 300))
+
+# What gets wiped when a driver goes back into the pool. Twitter keeps its
+# cookies so the logged-in session survives between requests, and drains the
+# performance log its drivers record for network extraction (chromedriver
+# buffers it until read, whichever extraction the request used).
+DRIVER_RESET = {
+    'twitter': {'cookies': False, 'tabs': True, 'performance_log': True},
+    'youtube': {'cookies': True, 'tabs': True},
+}
+
+# Saved Twitter login state (cookies plus local storage), reused across drivers
+TWITTER_SESSION_FILE = os.environ.get('TWITTER_SESSION_FILE', 'twitter_session.json')
+TWITTER_AUTH_COOKIE = 'auth_token'
+
+# Attribute set on result nodes once they have been extracted, so each scroll
+# step only looks at newly appended nodes
+SCRAPED_ATTR = 'data-scraped'
+UNSCRAPED = f':not([{SCRAPED_ATTR}])'
+
+# Tweet extraction: 'batch' pulls every rendered tweet with one injected script,
+# 'element' is the original per-element WebDriver path. Both use these selectors.
+# 'network' decodes the SearchTimeline JSON the page downloads (read from the
+# performance log), giving exact counts, tweet ids and timestamps.
+TWEET_EXTRACTION = os.environ.get('TWEET_EXTRACTION', 'batch')
+# Point at a local stand-in page serving recorded timeline payloads for testing
+TWITTER_BASE_URL = os.environ.get('TWITTER_BASE_URL', 'https://x.com')
+TWITTER_TIMELINE_PATTERN = re.compile(os.environ.get('TWITTER_TIMELINE_PATTERN', r'/graphql/[^/]+/SearchTimeline'))
+TWEET_SELECTORS = {
+    'tweet': 'article[data-testid="tweet"]',
+    'text': '[data-testid="tweetText"]',
+    'time': 'time',
+    'username': '[data-testid="User-Name"] a',
+    'permalink': 'a[href*="/status/"]',
+    'engagement': 'div[role="group"] > div',
+    'likes': 'button[data-testid="like"] span, div[data-testid="like"] span',
+    'retweets': 'button[data-testid="retweet"] span, div[data-testid="retweet"] span',
+    'replies': 'button[data-testid="reply"] span, div[data-testid="reply"] span',
+}
+
+# Mirrors extract_tweet_data + extract_twitter_engagement_metrics inside the page
+TWEET_BATCH_SCRIPT = """
+var sel = %s;
+var scrapedAttr = %s;
+function text(el) { return el ? (el.innerText || '').trim() : ''; }
+function firstText(tweet, selector, accept) {
+    var spans = tweet.querySelectorAll(selector);
+    for (var i = 0; i < spans.length; i++) {
+        var value = text(spans[i]);
+        if (value && accept(value)) { return value; }
+    }
+    return '0';
+}
+function isDigits(value) { return /^\\d+$/.test(value); }
+function isCount(value) { return isDigits(value) || value.indexOf('K') !== -1 || value.indexOf('M') !== -1; }
+return Array.prototype.map.call(document.querySelectorAll(sel.tweet + ':not([' + scrapedAttr + '])'), function (tweet) {
+    var textEl = tweet.querySelector(sel.text);
+    var timeEl = tweet.querySelector(sel.time);
+    var userEl = tweet.querySelector(sel.username);
+    var href = userEl ? (userEl.getAttribute('href') || '') : '';
+    var record = {
+        text: textEl ? (textEl.innerText || '') : '',
+        time: timeEl ? (timeEl.getAttribute('datetime') || '') : '',
+        username: href.split('/').pop(),
+        likes: '0', retweets: '0', replies: '0', views: '0'
+    };
+    var link = (timeEl && timeEl.closest('a')) || tweet.querySelector(sel.permalink);
+    var status = link ? (link.getAttribute('href') || '').match(/\\/status\\/(\\d+)/) : null;
+    record.status_id = status ? status[1] : '';
+    if (record.text) { tweet.setAttribute(scrapedAttr, '1'); }
+    tweet.querySelectorAll(sel.engagement).forEach(function (button) {
+        var label = button.getAttribute('aria-label');
+        var numbers = label ? label.match(/[\\d,]+/) : null;
+        if (!numbers) { return; }
+        var count = numbers[0].replace(/,/g, '');
+        label = label.toLowerCase();
+        if (label.indexOf('repl') !== -1) { record.replies = count; }
+        else if (label.indexOf('repost') !== -1 || label.indexOf('retweet') !== -1) { record.retweets = count; }
+        else if (label.indexOf('like') !== -1) { record.likes = count; }
+        else if (label.indexOf('view') !== -1) { record.views = count; }
+    });
+    if (record.likes === '0') { record.likes = firstText(tweet, sel.likes, isDigits); }
+    if (record.retweets === '0') { record.retweets = firstText(tweet, sel.retweets, isCount); }
+    if (record.replies === '0') { record.replies = firstText(tweet, sel.replies, isCount); }
+    return record;
+});
+""" % (json.dumps(TWEET_SELECTORS), json.dumps(SCRAPED_ATTR))
+
+# Network extraction reads no DOM, but still flags rendered tweets so the scroll waits see new ones
+MARK_ALL_SCRIPT = """
+var attr = arguments[1];
+document.querySelectorAll(arguments[0]).forEach(function (el) { el.setAttribute(attr, '1'); });
+"""
+
+# Selector cascades for YouTube video cards, tried in order (reordered at runtime by SelectorPlan)
+YOUTUBE_VIDEO_FIELDS = {
+    'title': {
+        'mode': 'link',
+        'selectors': [
+            'a#video-title',
+            'h3 a',
+            'h3.ytd-video-renderer a',
+            '.ytd-video-renderer h3 a',
+            'a[href*="/watch?v="]'
+        ],
+    },
+    'channel': {
+        'mode': 'text',
+        'selectors': [
+            'a.yt-simple-endpoint.style-scope.yt-formatted-string',
+            '.ytd-channel-name a',
+            '#channel-name a',
+            '.ytd-video-owner-renderer a',
+            'a[href*="/channel/"]',
+            'a[href*="/@"]'
+        ],
+    },
+    'metadata': {
+        'mode': 'texts',
+        'selectors': [
+            'span.style-scope.ytd-video-meta-block',
+            '#metadata-line span',
+            '.ytd-video-meta-block span'
+        ],
+    },
+    'duration': {
+        'mode': 'text',
+        'selectors': [
+            'span.ytd-thumbnail-overlay-time-status-renderer',
+            '.badge-shape-wiz__text',
+            'span.style-scope.ytd-thumbnail-overlay-time-status-renderer'
+        ],
+    },
+    'thumbnail': {
+        'mode': 'src',
+        'match': 'ytimg\\.com|ggpht\\.com',
+        'selectors': ['img'],
+    },
+}
+
+# Runs every field's selector cascade for a batch of containers in one call.
+# arguments[0]: {field: {mode, selectors, match}}, arguments[1]: elements or a container selector,
+# arguments[2]: optional attribute set on containers whose key field (arguments[3]) was found
+SELECTOR_PLAN_SCRIPT = """
+var plan = arguments[0];
+var containers = typeof arguments[1] === 'string' ? document.querySelectorAll(arguments[1]) : arguments[1];
+var markAttr = arguments[2];
+var keyField = arguments[3];
+function text(el) { return el ? (el.innerText || '').trim() : ''; }
+function probe(container, spec, selector) {
+    if (spec.mode === 'texts') {
+        var texts = [];
+        container.querySelectorAll(selector).forEach(function (el) {
+            var value = text(el);
+            if (value) { texts.push(value); }
+        });
+        return texts.length ? texts : null;
+    }
+    if (spec.mode === 'src') {
+        var pattern = new RegExp(spec.match || '.');
+        var images = container.querySelectorAll(selector);
+        for (var i = 0; i < images.length; i++) {
+            if (images[i].src && pattern.test(images[i].src)) { return images[i].src; }
+        }
+        return null;
+    }
+    var el = container.querySelector(selector);
+    var value = text(el);
+    if (!value) { return null; }
+    return spec.mode === 'link' ? {text: value, href: el.href || el.getAttribute('href') || ''} : value;
+}
+return Array.prototype.map.call(containers, function (container) {
+    var result = {values: {}, hits: {}};
+    Object.keys(plan).forEach(function (field) {
+        var spec = plan[field];
+        result.values[field] = null;
+        result.hits[field] = null;
+        for (var i = 0; i < spec.selectors.length; i++) {
+            var value = probe(container, spec, spec.selectors[i]);
+            if (value !== null) {
+                result.values[field] = value;
+                result.hits[field] = spec.selectors[i];
+                break;
+            }
+        }
+    });
+    if (markAttr && result.values[keyField] !== null) { container.setAttribute(markAttr, '1'); }
+    return result;
+});
+"""
+
+# Scroll engine: waits for new result nodes (or page growth) instead of sleeping,
+# never longer than SCROLL_MAX_WAIT, and stops after SCROLL_IDLE_LIMIT scrolls in a row
+# that produced no new items
+SCROLL_MIN_WAIT = float(os.environ.get('SCROLL_MIN_WAIT', 0.5))
+SCROLL_MAX_WAIT = float(os.environ.get('SCROLL_MAX_WAIT', 6))
+SCROLL_IDLE_LIMIT = int(os.environ.get('SCROLL_IDLE_LIMIT', 3))
+
+# Long-scroll mode, for requests of LONG_SCROLL_ITEMS or more: extracted nodes are
+# pruned from the page, and once the page's JS heap passes LONG_SCROLL_MAX_HEAP_MB the
+# browser is swapped for a fresh one that resumes after the last item seen.
+LONG_SCROLL_ITEMS = int(os.environ.get('LONG_SCROLL_ITEMS', 300))
+LONG_SCROLL_MAX_HEAP_MB = int(os.environ.get('LONG_SCROLL_MAX_HEAP_MB', 256))
+
+# Optionally scrolls, then resolves as soon as more unscraped item nodes exist than
+# baseline (-1: however many there were before scrolling) or the page got taller, or
+# when the timeout passes. One round trip per scroll step.
+# arguments: item selector, previous scrollHeight, timeout ms, scroll action
+# ('bottom', 'viewport' (one screenful), 'none' or a y offset), baseline
+SCROLL_WAIT_SCRIPT = """
+var selector = arguments[0], lastHeight = arguments[1], timeout = arguments[2], action = arguments[3];
+var baseline = arguments[4];
+var done = arguments[arguments.length - 1];
+var start = Date.now(), finished = false, pending = null;
+// A viewport step only cares about unscraped nodes that are now on screen
+var visibleOnly = action === 'viewport';
+function state() {
+    var nodes = document.querySelectorAll(selector), count = nodes.length;
+    if (visibleOnly) {
+        count = 0;
+        for (var i = 0; i < nodes.length; i++) {
+            var rect = nodes[i].getBoundingClientRect();
+            if (rect.bottom > 0 && rect.top < window.innerHeight) { count++; }
+        }
+    }
+    return {count: count, height: document.body.scrollHeight};
+}
+if (baseline < 0) { baseline = state().count; }
+function grown(s) { return s.count > baseline || (lastHeight > 0 && s.height > lastHeight); }
+function finish() {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    var s = state();
+    s.grown = grown(s);
+    s.elapsed = Date.now() - start;
+    done(s);
+}
+function check() {
+    pending = null;
+    if (grown(state())) { finish(); }
+}
+var observer = new MutationObserver(function () {
+    if (!pending) { pending = setTimeout(check, 50); }
+});
+observer.observe(document.body, {childList: true, subtree: true});
+var timer = setTimeout(finish, timeout);
+if (action === 'bottom') { window.scrollTo(0, document.body.scrollHeight); }
+else if (action === 'viewport') { window.scrollBy(0, window.innerHeight); }
+else if (typeof action === 'number') { window.scrollTo(0, action); }
+setTimeout(check, 0);
+"""
+
+# Long-scroll housekeeping after each extraction: drop extracted nodes (when given a
+# selector) and report the page's JS heap
+PRUNE_SCRIPT = """
+if (arguments[0]) {
+    document.querySelectorAll(arguments[0]).forEach(function (el) { el.remove(); });
+}
+var heap = (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0;
+return {heap: heap, height: document.body.scrollHeight};
+"""
+
+# YouTube search is read one screenful at a time: cards are extracted once their
+# lazily rendered parts (thumbnail, metadata line) are in, or after YOUTUBE_SETTLE_TIMEOUT
+YOUTUBE_SETTLE_TIMEOUT = float(os.environ.get('YOUTUBE_SETTLE_TIMEOUT', 1.5))
+YOUTUBE_VIDEO_CONTAINERS = [
+    'ytd-video-renderer',
+    'ytd-compact-video-renderer',
+    'div.ytd-video-renderer',
+    '[class*="video-renderer"]'
+]
+YOUTUBE_LAZY_READY = [
+    'img[src*="ytimg.com"], img[src*="ggpht.com"]',
+    '#metadata-line span',
+]
+
+# Resolves with the unscraped containers on (or above) the screen once each of them
+# matches every ready selector, or when the timeout passes.
+# arguments: container selectors (first one with matches wins), ready selectors, timeout ms
+VIEWPORT_BATCH_SCRIPT = """
+var selectors = arguments[0], ready = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+var start = Date.now();
+function visible() {
+    for (var i = 0; i < selectors.length; i++) {
+        var nodes = Array.prototype.filter.call(document.querySelectorAll(selectors[i]), function (node) {
+            return node.getBoundingClientRect().top < window.innerHeight;
+        });
+        if (nodes.length) { return nodes; }
+    }
+    return [];
+}
+function settled(nodes) {
+    // Cards already scrolled past are taken as they are; only wait on the ones on screen
+    return nodes.every(function (node) {
+        if (node.getBoundingClientRect().bottom <= 0) { return true; }
+        return ready.every(function (selector) { return node.querySelector(selector) !== null; });
+    });
+}
+(function poll() {
+    var nodes = visible();
+    if (settled(nodes) || Date.now() - start >= timeout) { done(nodes); }
+    else { setTimeout(poll, 100); }
+})();
+"""
+
+# Browserless YouTube engine: 'http' reads the ytInitialData embedded in the page and
+# follows continuation tokens, 'browser' drives Chrome, 'auto' uses Chrome only when
+# the HTTP engine cannot parse the page
+YOUTUBE_ENGINE = os.environ.get('YOUTUBE_ENGINE', 'auto')
+YOUTUBE_BASE_URL = os.environ.get('YOUTUBE_BASE_URL', 'https://www.youtube.com')
+# Search result order -> the results page's sp filter parameter
+YOUTUBE_SEARCH_SORT = {'relevance': None, 'upload_date': 'CAI='}
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 15))
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Background jobs: worker threads running scrapes, and how many jobs may wait for one
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 20))
+JOB_RETENTION_SECONDS = int(os.environ.get('JOB_RETENTION_SECONDS', 3600))
+
+# Admission control: concurrent scrapes allowed per lane. Twitter scrapes take a slot
+# on both the twitter lane and the shared logged-in account; every scrape that drives
+# a browser also takes one on the browser lane, sized to the driver pool, so admitted
+# scrapes never wait out the pool checkout. YouTube scrapes on the HTTP engine start
+# no browser and skip admission ('auto' is admitted only if it falls back to Chrome).
+# Each lane queues at most ADMISSION_QUEUE_SIZE waiters, interactive ones ahead of
+# bulk ones (jobs), and interactive requests give up with a 429 after
+# ADMISSION_MAX_WAIT seconds in total.
+ADMISSION_LIMITS = {
+    'twitter_account': int(os.environ.get('ADMISSION_TWITTER_ACCOUNT', 1)),
+    'twitter': int(os.environ.get('ADMISSION_TWITTER', 1)),
+    'youtube': int(os.environ.get('ADMISSION_YOUTUBE', 2)),
+    'browser': DRIVER_POOL_SIZE,
+}
+ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE', 8))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 30))
+PRIORITIES = {'interactive': 0, 'bulk': 1}
+
+# Result cache for repeated searches, keyed by platform, normalized query and count
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 300))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 256))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Watchlist: search terms polled on their own interval, each poll scraping only items
+# newer than the watch's high-water mark. Poll starts are at least WATCH_MIN_GAP
+# seconds apart. New items are POSTed to the watch's webhook (or WATCH_WEBHOOK_URL),
+# otherwise kept (up to WATCH_QUEUE_SIZE batches) for GET /watchlist/events.
+WATCHLIST_FILE = os.environ.get('WATCHLIST_FILE', 'watchlist.json')
+WATCH_MIN_INTERVAL = float(os.environ.get('WATCH_MIN_INTERVAL', 60))
+WATCH_MIN_GAP = float(os.environ.get('WATCH_MIN_GAP', 10))
+WATCH_MAX_ITEMS = int(os.environ.get('WATCH_MAX_ITEMS', 50))
+WATCH_WEBHOOK_URL = os.environ.get('WATCH_WEBHOOK_URL', '')
+WATCH_QUEUE_SIZE = int(os.environ.get('WATCH_QUEUE_SIZE', 1000))
+# Keys of the latest items remembered per watch, to spot where the new ones end
+WATCH_KNOWN_KEYS = 500
+WATCH_PLATFORMS = ('twitter', 'youtube')
+
+# Result store: every scraped item is upserted into this SQLite file (empty to turn it
+# off) by a background writer, in batches of up to STORE_BATCH_SIZE or every
+# STORE_FLUSH_INTERVAL seconds. Items arriving while STORE_QUEUE_SIZE are waiting are dropped.
+STORE_PATH = os.environ.get('STORE_PATH', 'scraped_items.db')
+STORE_BATCH_SIZE = int(os.environ.get('STORE_BATCH_SIZE', 200))
+STORE_FLUSH_INTERVAL = float(os.environ.get('STORE_FLUSH_INTERVAL', 1.0))
+STORE_QUEUE_SIZE = int(os.environ.get('STORE_QUEUE_SIZE', 10000))
+STORE_SEARCH_MAX_LIMIT = 1000
+
+# Batch comments: browsers from the pool each drive several tabs. The global tab cap
+# is COMMENT_BATCH_MAX_TABS, or (when 0) derived from available memory at
+# COMMENT_TAB_MEMORY_MB per tab.
+COMMENT_BATCH_BROWSERS = int(os.environ.get('COMMENT_BATCH_BROWSERS', 2))
+COMMENT_BATCH_TABS_PER_BROWSER = int(os.environ.get('COMMENT_BATCH_TABS_PER_BROWSER', 3))
+COMMENT_BATCH_MAX_TABS = int(os.environ.get('COMMENT_BATCH_MAX_TABS', 0))
+COMMENT_BATCH_MAX_PER_VIDEO = int(os.environ.get('COMMENT_BATCH_MAX_PER_VIDEO', 500))
+COMMENT_TAB_MEMORY_MB = int(os.environ.get('COMMENT_TAB_MEMORY_MB', 150))
+# Comments taken from one tab before moving on to the next
+COMMENT_TAB_TURN = int(os.environ.get('COMMENT_TAB_TURN', 20))
+
+# Per-platform time limit (seconds) for the concurrent scrapes behind /fetch-all
+FETCH_ALL_TIMEOUT = float(os.environ.get('FETCH_ALL_TIMEOUT', 300))
+
+# Resource profiles, picked per request: URL patterns the browser is told not to
+# fetch (DevTools network blocking) and the page-load strategy of its drivers.
+# 'eager' makes driver.get return at DOMContentLoaded; the scroll waits already
+# poll for the result nodes. Thumbnails are read from element attributes, so they
+# survive image blocking.
+RESOURCE_PROFILE = os.environ.get('RESOURCE_PROFILE', 'full')
+BLOCKED_MEDIA = [
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.ico*',
+    '*pbs.twimg.com/media/*', '*pbs.twimg.com/profile_images/*', '*pbs.twimg.com/ext_tw_video_thumb/*',
+    '*i.ytimg.com/*', '*yt3.ggpht.com/*',
+    '*.mp4*', '*.webm*', '*.m4s*', '*.m3u8*', '*video.twimg.com/*', '*googlevideo.com/videoplayback*',
+    '*.woff*', '*.ttf*', '*.otf*',
+]
+BLOCKED_TRACKERS = [
+    '*doubleclick.net/*', '*google-analytics.com/*', '*googletagmanager.com/*', '*googlesyndication.com/*',
+    '*youtube.com/api/stats/*', '*youtube.com/ptracking*', '*youtube.com/pagead/*',
+    '*ads-twitter.com/*', '*x.com/i/api/1.1/jot/*',
+]
+RESOURCE_PROFILES = {
+    'full': {'page_load': 'normal', 'block': []},
+    'lean': {'page_load': 'eager', 'block': BLOCKED_MEDIA + BLOCKED_TRACKERS},
+    # Also drops stylesheets; layout-dependent lazy loading may fetch in bigger steps
+    'text-only': {'page_load': 'eager', 'block': BLOCKED_MEDIA + BLOCKED_TRACKERS + ['*.css*']},
+}
+
+# Response shaping: typed=true turns count strings ('1.2K', '3,456', '1.2M views')
+# into integers and relative ages ('3 days ago') into UTC timestamps; format=columnar
+# returns one array per field. JSON bodies of COMPRESS_MIN_BYTES or more are sent
+# brotli- (when installed) or gzip-compressed if the client accepts it.
+TYPED_METRICS = os.environ.get('TYPED_METRICS', 'false')
+TYPED_FIELDS = {
+    'twitter': {'counts': ['likes', 'retweets', 'replies', 'views'], 'times': ['time']},
+    'youtube': {'counts': ['views'], 'times': ['upload_time']},
+    'youtube_comment': {'counts': ['likes'], 'times': ['time']},
+}
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+
+STEALTH_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# Histogram buckets (seconds) for phase, WebDriver command and HTTP request timings
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Metric:
+    """Base for the in-process Prometheus metrics; values are kept per label tuple"""
+    type = 'untyped'
+
+    def __init__(self, name, description, labels=()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    @staticmethod
+    def format_labels(names, values):
+        if not names:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for v in values)
+        return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.extend(self.render_sample(key, value))
+        return lines
+
+    def render_sample(self, key, value):
+        return [f"{self.name}{self.format_labels(self.labels, key)} {value:g}"]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Gauge read at scrape time from callback() -> {label tuple: value}"""
+    type = 'gauge'
+
+    def __init__(self, name, description, labels=(), callback=None):
+        super().__init__(name, description, labels)
+        self.callback = callback
+
+    def render(self):
+        if self.callback:
+            try:
+                values = self.callback()
+            except Exception as e:
+                logger.warning("Metric %s could not be read: %s", self.name, e)
+                values = {}
+            with self.lock:
+                self.values = dict(values)
+        return super().render()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, description, labels=(), buckets=METRIC_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def render_sample(self, key, state):
+        lines = []
+        names = self.labels + ('le',)
+        cumulative = 0
+        for bound, count in zip(self.buckets, state['counts']):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self.format_labels(names, key + (f'{bound:g}',))} {cumulative}")
+        lines.append(f"{self.name}_bucket{self.format_labels(names, key + ('+Inf',))} {state['count']}")
+        lines.append(f"{self.name}_sum{self.format_labels(self.labels, key)} {state['sum']:g}")
+        lines.append(f"{self.name}_count{self.format_labels(self.labels, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+PHASE_SECONDS = METRICS.register(Histogram(
+    'scraper_phase_seconds', 'Time spent in each scrape phase', ('platform', 'phase')
+))
+WEBDRIVER_COMMANDS = METRICS.register(Counter(
+    'scraper_webdriver_commands_total', 'WebDriver commands sent to chromedriver', ('command',)
+))
+WEBDRIVER_COMMAND_SECONDS = METRICS.register(Histogram(
+    'scraper_webdriver_command_seconds', 'WebDriver command round-trip time', ('command',)
+))
+SCRAPED_ITEMS = METRICS.register(Counter(
+    'scraper_items_total', 'Items scraped', ('platform', 'engine')
+))
+HTTP_REQUESTS = METRICS.register(Counter(
+    'scraper_http_requests_total', 'API requests served', ('endpoint', 'status')
+))
+HTTP_REQUEST_SECONDS = METRICS.register(Histogram(
+    'scraper_http_request_seconds', 'API request duration, including streamed bodies', ('endpoint',)
+))
+ADMISSION_REJECTED = METRICS.register(Counter(
+    'scraper_admission_rejected_total', 'Scrapes turned away with a 429', ('lane',)
+))
+
+
+class Deadline:
+    """Time budget of one request; scrape loops check it between steps
+
+    seconds None means no time limit. A parent deadline also bounds this one,
+    and setting cancel_event ends it early (without counting as a hit).
+    """
+
+    def __init__(self, seconds=None, parent=None, cancel_event=None):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds if seconds is not None else None
+        self.parent = parent
+        self.cancel_event = cancel_event
+        self.hit = False
+
+    def cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            return True
+        return bool(self.parent and self.parent.cancelled())
+
+    def remaining(self):
+        if self.cancelled():
+            return 0.0
+        remaining = float('inf') if self.expires is None else max(0.0, self.expires - time.monotonic())
+        return min(remaining, self.parent.remaining()) if self.parent else remaining
+
+    def expired(self):
+        """True once the budget is spent, remembering that a scrape was cut short by it"""
+        if not self.hit:
+            if self.expires is not None and time.monotonic() >= self.expires:
+                self.hit = True
+            elif self.parent and self.parent.expired() and self.parent.hit:
+                self.hit = True
+        return self.hit or self.cancelled()
+
+
+class Trace:
+    """Per-request totals of phase time and WebDriver commands
+
+    Also carries the request's Deadline, since the trace already follows the
+    request into worker threads, and its admitter: a callable admitting more
+    lanes on the same terms as the scrape itself (see admit_fallback).
+    """
+
+    def __init__(self, deadline=None):
+        self.phases = {}
+        self.commands = 0
+        self.deadline = deadline
+        self.admitter = None
+        self.lock = threading.Lock()
+
+    def add_phase(self, name, seconds):
+        with self.lock:
+            total, count = self.phases.get(name, (0.0, 0))
+            self.phases[name] = (total + seconds, count + 1)
+
+    def add_command(self):
+        with self.lock:
+            self.commands += 1
+
+    def summary(self):
+        with self.lock:
+            return {
+                'phases': {name: {'seconds': round(total, 4), 'count': count}
+                           for name, (total, count) in self.phases.items()},
+                'webdriver_commands': self.commands,
+            }
+
+
+_trace_local = threading.local()
+
+def current_trace():
+    return getattr(_trace_local, 'trace', None)
+
+def set_trace(trace):
+    """Make trace collect the phases run on this thread (None to stop)"""
+    _trace_local.trace = trace
+
+def set_deadline(deadline):
+    """Give this thread its own Deadline instead of the trace's (None to go back)"""
+    _trace_local.deadline = deadline
+
+def current_deadline():
+    deadline = getattr(_trace_local, 'deadline', None)
+    if deadline is not None:
+        return deadline
+    trace = current_trace()
+    return trace.deadline if trace else None
+
+def deadline_expired():
+    deadline = current_deadline()
+    return bool(deadline and deadline.expired())
+
+def deadline_hit():
+    """True if the current deadline (or a cancel) has already stopped a scrape"""
+    deadline = current_deadline()
+    return bool(deadline and (deadline.hit or deadline.cancelled()))
+
+def time_left(limit):
+    """limit (seconds), shortened to what is left of the current deadline"""
+    deadline = current_deadline()
+    return min(limit, deadline.remaining()) if deadline else limit
+
+def collect_items(items):
+    """Drain a scrape generator into (items, error); an exception keeps what was gathered so far"""
+    results = []
+    try:
+        for item in items:
+            results.append(item)
+    except Exception as e:
+        logger.error("Scrape stopped after %s items: %s", len(results), e)
+        return results, str(e)
+    return results, None
+
+
+def record_phase(platform, name, seconds):
+    PHASE_SECONDS.observe(seconds, platform=platform, phase=name)
+    trace = current_trace()
+    if trace:
+        trace.add_phase(name, seconds)
+
+
+@contextmanager
+def phase(platform, name):
+    """Time a block as one scrape phase, for /metrics and the current request's trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(platform, name, time.perf_counter() - started)
+
+
+def count_webdriver_commands(driver):
+    """Route driver.execute (which WebElements call too) through the command metrics"""
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        started = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            WEBDRIVER_COMMANDS.inc(command=driver_command)
+            WEBDRIVER_COMMAND_SECONDS.observe(time.perf_counter() - started, command=driver_command)
+            trace = current_trace()
+            if trace:
+                trace.add_command()
+
+    driver.execute = counted_execute
+    return driver
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no driver could be checked out before the timeout"""
+
+
+class PooledDriver:
+    def __init__(self, driver, platform, page_load='normal'):
+        self.driver = driver
+        self.platform = platform
+        self.page_load = page_load
+        self.uses = 0
+        self.created = time.time()
+        self.retired = False
+
+
+class DriverPool:
+    """Bounded pool of pre-launched Chrome drivers shared across requests
+
+    Drivers are kept per (platform, page-load strategy), since the strategy is
+    fixed when Chrome starts; factory(platform, page_load) launches one.
+    """
+
+    def __init__(self, factory, max_size=DRIVER_POOL_SIZE, warm_counts=None,
+                 max_uses=DRIVER_MAX_USES, max_memory_mb=DRIVER_MAX_MEMORY_MB,
+                 checkout_timeout=DRIVER_CHECKOUT_TIMEOUT, reset_options=None):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.warm_counts = dict(DRIVER_POOL_WARM if warm_counts is None else warm_counts)
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.checkout_timeout = checkout_timeout
+        self.reset_options = dict(DRIVER_RESET if reset_options is None else reset_options)
+        self._idle = {}
+        self._busy = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm(self):
+        """Launch idle drivers until every platform reaches its warm count"""
+        page_load = RESOURCE_PROFILES.get(RESOURCE_PROFILE, RESOURCE_PROFILES['full'])['page_load']
+        for platform, count in self.warm_counts.items():
+            key = (platform, page_load)
+            while True:
+                with self._cond:
+                    if self._closed or self._size >= self.max_size:
+                        return
+                    if len(self._idle.get(key, [])) >= count:
+                        break
+                    self._size += 1
+                try:
+                    entry = PooledDriver(self.factory(platform, page_load), platform, page_load)
+                except Exception as e:
+                    logger.warning("Driver pool warm-up error (%s): %s", platform, e)
+                    self._release_slot()
+                    break
+                with self._cond:
+                    self._idle.setdefault(key, []).append(entry)
+                    self._cond.notify()
+
+    def warm_in_background(self):
+        if any(self.warm_counts.values()):
+            threading.Thread(target=self.warm, daemon=True).start()
+
+    def checkout(self, platform, timeout=None, page_load='normal'):
+        """Take a healthy driver for platform, waiting for a free slot if needed"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        key = (platform, page_load)
+        deadline = time.monotonic() + timeout
+        entry = None
+        victim = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise DriverPoolTimeout("Driver pool is closed")
+                idle = self._idle.get(key)
+                if idle:
+                    entry = idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                # Reuse the slot of a driver idling for another platform or strategy
+                victim = self._pop_idle_other(key)
+                if victim:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DriverPoolTimeout(
+                        f"No browser available for {platform} after {timeout:g}s"
+                    )
+                self._cond.wait(remaining)
+
+        if victim:
+            self._quit(victim.driver)
+        if entry and not self._is_healthy(entry.driver):
+            self._quit(entry.driver)
+            entry = None
+        if entry is None:
+            try:
+                entry = PooledDriver(self.factory(platform, page_load), platform, page_load)
+            except Exception:
+                self._release_slot()
+                raise
+
+        entry.uses += 1
+        with self._cond:
+            self._busy[id(entry.driver)] = entry
+        return entry.driver
+
+    def checkin(self, driver, discard=False):
+        """Return a driver to the pool, recycling it if it is worn out"""
+        with self._cond:
+            entry = self._busy.pop(id(driver), None)
+        if entry is None:
+            self._quit(driver)
+            return
+
+        recycle = discard or entry.retired or self._closed or entry.uses >= self.max_uses
+        if not recycle and self._memory_mb(driver) >= self.max_memory_mb:
+            recycle = True
+        if not recycle:
+            try:
+                self._reset(entry)
+            except Exception as e:
+                logger.warning("Driver reset error: %s", e)
+                recycle = True
+
+        if recycle:
+            self._quit(driver)
+            self._release_slot()
+            self.warm_in_background()
+        else:
+            with self._cond:
+                self._idle.setdefault((entry.platform, entry.page_load), []).append(entry)
+                self._cond.notify()
+
+    def retire(self, driver):
+        """Have a checked-out driver quit instead of going back to the pool"""
+        with self._cond:
+            entry = self._busy.get(id(driver))
+            if entry:
+                entry.retired = True
+
+    @contextmanager
+    def driver(self, platform, timeout=None, page_load='normal'):
+        driver = self.checkout(platform, timeout, page_load)
+        discard = False
+        try:
+            yield driver
+        except WebDriverException:
+            discard = True
+            raise
+        finally:
+            self.checkin(driver, discard=discard)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'max_size': self.max_size,
+                'busy': len(self._busy),
+                'idle': {
+                    platform if page_load == 'normal' else f'{platform}:{page_load}': len(entries)
+                    for (platform, page_load), entries in self._idle.items()
+                },
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle = {}
+            self._size -= len(entries)
+            self._cond.notify_all()
+        for entry in entries:
+            self._quit(entry.driver)
+
+    def _pop_idle_other(self, key):
+        for other, idle in self._idle.items():
+            if other != key and idle:
+                return idle.pop(0)
+        return None
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _reset(self, entry):
+        driver = entry.driver
+        options = self.reset_options.get(entry.platform, {'cookies': True, 'tabs': True})
+        if options.get('tabs', True):
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+        if options.get('cookies', True):
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+        driver.get('about:blank')
+        if options.get('performance_log'):
+            driver.get_log('performance')
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            return driver.execute_script('return 1') == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _memory_mb(driver):
+        try:
+            heap = driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0"
+            )
+            return (heap or 0) / (1024 * 1024)
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+class TwitterSession:
+    """Twitter login state persisted to disk so new drivers can skip the login form"""
+
+    def __init__(self, path=TWITTER_SESSION_FILE):
+        self.path = path
+        self.state = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                self.state = json.load(f)
+        except FileNotFoundError:
+            self.state = None
+        except Exception as e:
+            logger.warning("Could not read Twitter session file: %s", e)
+            self.state = None
+
+    def is_valid(self):
+        """Cheap check: the saved auth cookie exists and has not expired"""
+        with self._lock:
+            state = self.state
+        if not state:
+            return False
+        return has_live_auth_cookie(state.get('cookies', []))
+
+    def save(self, driver):
+        state = {
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(
+                "var items = {};"
+                "for (var i = 0; i < localStorage.length; i++) {"
+                "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+                "}"
+                "return items;"
+            ) or {},
+            'url': driver.current_url,
+            'saved_at': time.time(),
+        }
+        with self._lock:
+            self.state = state
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+
+    def apply(self, driver):
+        """Load the saved cookies and local storage into driver"""
+        with self._lock:
+            state = self.state
+        # Cookies and local storage can only be set from the same origin, so load a cheap page first
+        driver.get(f'{TWITTER_BASE_URL}/robots.txt')
+        for cookie in state.get('cookies', []):
+            cookie = {k: v for k, v in cookie.items() if k in ('name', 'value', 'domain', 'path', 'expiry', 'secure', 'httpOnly', 'sameSite')}
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logger.debug("Skipping Twitter session cookie %s: %s", cookie.get('name'), e)
+        local_storage = state.get('local_storage') or {}
+        if local_storage:
+            driver.execute_script(
+                "var items = arguments[0];"
+                "Object.keys(items).forEach(function (key) { localStorage.setItem(key, items[key]); });",
+                local_storage
+            )
+
+    def invalidate(self):
+        with self._lock:
+            self.state = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+def has_live_auth_cookie(cookies):
+    now = time.time()
+    for cookie in cookies:
+        if cookie.get('name') == TWITTER_AUTH_COOKIE and cookie.get('value'):
+            expiry = cookie.get('expiry', cookie.get('expires'))
+            if not expiry or expiry < 0 or expiry > now:
+                return True
+    return False
+
+
+class SelectorPlan:
+    """Selector cascades evaluated in the browser, with the currently working selector tried first"""
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._order = {field: list(spec['selectors']) for field, spec in fields.items()}
+        self._stats = {
+            field: {
+                'found': 0,
+                'missing': 0,
+                'selectors': {selector: {'hits': 0, 'misses': 0} for selector in spec['selectors']},
+            }
+            for field, spec in fields.items()
+        }
+        self._lock = threading.Lock()
+
+    def compiled(self):
+        with self._lock:
+            return {
+                field: dict(spec, selectors=list(self._order[field]))
+                for field, spec in self.fields.items()
+            }
+
+    def run(self, driver, containers, mark_attr=None, key_field=None):
+        """Extract every field from each container with a single execute_script call
+
+        With mark_attr, containers whose key_field was found get that attribute so
+        later passes can skip them.
+        """
+        plan = self.compiled()
+        results = driver.execute_script(SELECTOR_PLAN_SCRIPT, plan, containers, mark_attr, key_field) or []
+        self.record(plan, results)
+        return [result['values'] for result in results]
+
+    def record(self, plan, results):
+        with self._lock:
+            for field, spec in plan.items():
+                stats = self._stats[field]
+                batch_hits = {}
+                for result in results:
+                    hit = result['hits'].get(field)
+                    tried = spec['selectors'] if hit is None else spec['selectors'][:spec['selectors'].index(hit)]
+                    for selector in tried:
+                        stats['selectors'][selector]['misses'] += 1
+                    if hit is None:
+                        stats['missing'] += 1
+                    else:
+                        stats['found'] += 1
+                        stats['selectors'][hit]['hits'] += 1
+                        batch_hits[hit] = batch_hits.get(hit, 0) + 1
+                if batch_hits:
+                    # Whatever matched in this batch moves to the front, busiest first
+                    self._order[field].sort(key=lambda selector: -batch_hits.get(selector, 0))
+
+    def stats(self):
+        with self._lock:
+            return {
+                field: {
+                    'order': list(self._order[field]),
+                    'found': stats['found'],
+                    'missing': stats['missing'],
+                    'selectors': {selector: dict(counts) for selector, counts in stats['selectors'].items()},
+                }
+                for field, stats in self._stats.items()
+            }
+
+
+class ScraperError(Exception):
+    """Raised by the scrape generators for failures reported back to the caller"""
+
+
+class YouTubeParseError(ScraperError):
+    """Raised when a YouTube page does not contain the data the HTTP engine expects"""
+
+
+def yt_text(node):
+    """Plain text of a YouTube text object ({'simpleText': ...} or {'runs': [...]})"""
+    if not node:
+        return ''
+    if 'simpleText' in node:
+        return node['simpleText']
+    return ''.join(run.get('text', '') for run in node.get('runs', []))
+
+
+def yt_find(node, key):
+    """Yield every value stored under key anywhere inside a ytInitialData-style tree"""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            for k, v in current.items():
+                if k == key:
+                    yield v
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        elif isinstance(current, list):
+            stack.extend(reversed(current))
+
+
+def yt_continuation_token(node):
+    for renderer in yt_find(node, 'continuationItemRenderer'):
+        token = (
+            renderer.get('continuationEndpoint', {}).get('continuationCommand', {}).get('token')
+            or renderer.get('button', {}).get('buttonRenderer', {}).get('command', {})
+                       .get('continuationCommand', {}).get('token')
+        )
+        if token:
+            return token
+    return None
+
+
+class YouTubeHttpClient:
+    """Reads YouTube pages and innertube continuations over pooled HTTP connections"""
+
+    def __init__(self, base_url=YOUTUBE_BASE_URL):
+        self.base_url = base_url.rstrip('/')
+        self.http = urllib3.PoolManager(
+            maxsize=HTTP_POOL_SIZE,
+            block=False,
+            timeout=urllib3.Timeout(total=HTTP_TIMEOUT),
+            retries=urllib3.Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503]),
+            headers={'User-Agent': USER_AGENT, 'Accept-Language': 'en-US,en;q=0.9'},
+        )
+
+    def get_page(self, path, params=None):
+        """Fetch a page; returns (ytInitialData, innertube config)"""
+        url = f"{self.base_url}{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        with phase('youtube', 'http_fetch'):
+            response = self.http.request('GET', url, headers={'Cookie': 'CONSENT=YES+1'},
+                                         timeout=max(1.0, time_left(HTTP_TIMEOUT)))
+        if response.status != 200:
+            raise ScraperError(f"YouTube returned HTTP {response.status} for {path}")
+        html = response.data.decode('utf-8', errors='replace')
+        return self.parse_initial_data(html), self.parse_config(html)
+
+    @staticmethod
+    def parse_initial_data(html):
+        match = re.search(r'(?:var\s+ytInitialData|window\[["\']ytInitialData["\']\])\s*=\s*', html)
+        if not match:
+            raise YouTubeParseError("ytInitialData not found in page")
+        try:
+            data, _ = json.JSONDecoder().raw_decode(html, match.end())
+        except ValueError as e:
+            raise YouTubeParseError(f"ytInitialData is not valid JSON: {str(e)}")
+        return data
+
+    @staticmethod
+    def parse_config(html):
+        config = {}
+        for name, key in (('api_key', 'INNERTUBE_API_KEY'), ('client_version', 'INNERTUBE_CLIENT_VERSION'),
+                          ('visitor_data', 'VISITOR_DATA')):
+            match = re.search(rf'"{key}"\s*:\s*"([^"]+)"', html)
+            config[name] = match.group(1) if match else None
+        return config
+
+    def api(self, endpoint, config, continuation):
+        """POST a continuation token to an innertube endpoint (search, next, ...)"""
+        if not config.get('api_key') or not config.get('client_version'):
+            raise YouTubeParseError("innertube config not found in page")
+        context = {'client': {'clientName': 'WEB', 'clientVersion': config['client_version'], 'hl': 'en', 'gl': 'US'}}
+        if config.get('visitor_data'):
+            context['client']['visitorData'] = config['visitor_data']
+        with phase('youtube', 'http_fetch'):
+            response = self.http.request(
+                'POST',
+                f"{self.base_url}/youtubei/v1/{endpoint}?{urlencode({'key': config['api_key'], 'prettyPrint': 'false'})}",
+                body=json.dumps({'context': context, 'continuation': continuation}),
+                headers={'Content-Type': 'application/json'},
+                timeout=max(1.0, time_left(HTTP_TIMEOUT)),
+            )
+        if response.status != 200:
+            raise ScraperError(f"YouTube {endpoint} continuation returned HTTP {response.status}")
+        return json.loads(response.data.decode('utf-8'))
+
+    def video_data(self, renderer):
+        """Map a videoRenderer to the fields extract_youtube_video_data returns"""
+        thumbnails = renderer.get('thumbnail', {}).get('thumbnails', [])
+        snippets = renderer.get('detailedMetadataSnippets') or []
+        description = yt_text(snippets[0].get('snippetText')) if snippets else yt_text(renderer.get('descriptionSnippet'))
+        return {
+            'platform': 'youtube',
+            'title': yt_text(renderer.get('title')),
+            'channel': yt_text(renderer.get('ownerText') or renderer.get('longBylineText')),
+            'views': yt_text(renderer.get('shortViewCountText') or renderer.get('viewCountText')) or '0',
+            'upload_time': yt_text(renderer.get('publishedTimeText')),
+            'duration': yt_text(renderer.get('lengthText')),
+            'thumbnail': thumbnails[-1]['url'] if thumbnails else '',
+            'video_url': f"{self.base_url}/watch?v={renderer['videoId']}",
+            'description': description
+        }
+
+    def iter_comments(self, video_url, num_comments=50, sort='top'):
+        """Yield comments page by page from the watch page's comment continuation
+
+        Only one page of comments is held at a time. sort is 'top' or 'newest'.
+        """
+        video_id = parse_youtube_video_id(video_url)
+        if not video_id:
+            raise ScraperError(f"Could not find a video id in {video_url}")
+        data, config = self.get_page('/watch', {'v': video_id})
+
+        token = None
+        for section in yt_find(data, 'itemSectionRenderer'):
+            if section.get('sectionIdentifier') == 'comment-item-section':
+                token = yt_continuation_token(section)
+                break
+        if not token:
+            raise YouTubeParseError("comment continuation not found on watch page")
+
+        header, page = self.comment_page(self.api('next', config, token))
+        if sort == 'newest':
+            sort_items = next(yt_find(header or {}, 'subMenuItems'), [])
+            if len(sort_items) > 1:
+                newest = sort_items[1].get('serviceEndpoint', {}).get('continuationCommand', {}).get('token')
+                if newest:
+                    _, page = self.comment_page(self.api('next', config, newest))
+
+        seen = set()
+        yielded = 0
+        while True:
+            response, threads, token = page
+            for comment_id, comment_data in self.comment_records(response, threads, video_url):
+                if comment_id in seen or not comment_data['text']:
+                    continue
+                seen.add(comment_id)
+                item_scraped(comment_data, 'youtube_comment', 'http')
+                yield comment_data
+                yielded += 1
+                if yielded >= num_comments:
+                    return
+            if not token or deadline_expired():
+                return
+            _, page = self.comment_page(self.api('next', config, token))
+
+    @staticmethod
+    def comment_page(response):
+        """Split a 'next' response into (comments header, (response, thread items, next token))"""
+        header = None
+        threads = []
+        token = None
+        for endpoint in response.get('onResponseReceivedEndpoints', []):
+            action = endpoint.get('reloadContinuationItemsCommand') or endpoint.get('appendContinuationItemsAction') or {}
+            for item in action.get('continuationItems') or []:
+                if 'commentsHeaderRenderer' in item:
+                    header = item['commentsHeaderRenderer']
+                elif 'commentThreadRenderer' in item:
+                    threads.append(item['commentThreadRenderer'])
+                elif 'continuationItemRenderer' in item:
+                    token = yt_continuation_token(item)
+        return header, (response, threads, token)
+
+    @staticmethod
+    def comment_records(response, threads, video_url):
+        """Yield (comment_id, comment_data) for each thread, old or view-model layout"""
+        entities = {}
+        for mutation in response.get('frameworkUpdates', {}).get('entityBatchUpdate', {}).get('mutations', []):
+            payload = mutation.get('payload', {}).get('commentEntityPayload')
+            if payload:
+                entities[payload.get('key')] = payload
+
+        for thread in threads:
+            renderer = thread.get('comment', {}).get('commentRenderer')
+            if renderer:
+                comment_id = renderer.get('commentId')
+                yield comment_id, {
+                    'platform': 'youtube_comment',
+                    'comment_id': comment_id or '',
+                    'text': yt_text(renderer.get('contentText')).strip(),
+                    'author': yt_text(renderer.get('authorText')).strip(),
+                    'likes': yt_text(renderer.get('voteCount')).strip() or '0',
+                    'time': yt_text(renderer.get('publishedTimeText')).strip(),
+                    'video_url': video_url
+                }
+                continue
+            view_model = thread.get('commentViewModel', {}).get('commentViewModel', {})
+            payload = entities.get(view_model.get('commentKey'))
+            if not payload:
+                continue
+            properties = payload.get('properties', {})
+            comment_id = properties.get('commentId') or view_model.get('commentId')
+            yield comment_id, {
+                'platform': 'youtube_comment',
+                'comment_id': comment_id or '',
+                'text': properties.get('content', {}).get('content', '').strip(),
+                'author': payload.get('author', {}).get('displayName', '').strip(),
+                'likes': payload.get('toolbar', {}).get('likeCountNotliked', '').strip() or '0',
+                'time': properties.get('publishedTime', '').strip(),
+                'video_url': video_url
+            }
+
+    def iter_search(self, search_term, num_videos=50, sort='relevance'):
+        """Yield search results page by page until num_videos or the results run out"""
+        params = {'search_query': search_term}
+        if YOUTUBE_SEARCH_SORT.get(sort):
+            params['sp'] = YOUTUBE_SEARCH_SORT[sort]
+        data, config = self.get_page('/results', params)
+        if 'twoColumnSearchResultsRenderer' not in data.get('contents', {}):
+            raise YouTubeParseError("search results layout not recognised")
+
+        seen = set()
+        yielded = 0
+        while True:
+            for renderer in yt_find(data, 'videoRenderer'):
+                if 'videoId' not in renderer or renderer['videoId'] in seen:
+                    continue
+                seen.add(renderer['videoId'])
+                video_data = self.video_data(renderer)
+                if len(video_data['title']) <= 3:
+                    continue
+                item_scraped(video_data, 'youtube', 'http')
+                yield video_data
+                yielded += 1
+                if yielded >= num_videos:
+                    return
+            token = yt_continuation_token(data)
+            if not token or deadline_expired():
+                return
+            data = self.api('search', config, token)
+
+
+def twitter_time(created_at):
+    """'Wed Oct 10 20:19:24 +0000 2018' -> '2018-10-10T20:19:24.000Z', the format of the page's <time datetime>"""
+    try:
+        parsed = datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y')
+    except (TypeError, ValueError):
+        return ''
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def timeline_tweets(payload):
+    """Yield (tweet_id, tweet_data) for every tweet in a SearchTimeline response"""
+    for results in yt_find(payload, 'tweet_results'):
+        tweet = results.get('result') or {}
+        # Tweets with limited visibility wrap the real tweet one level down
+        tweet = tweet.get('tweet', tweet)
+        legacy = tweet.get('legacy')
+        if not legacy:
+            continue
+        user = ((tweet.get('core') or {}).get('user_results') or {}).get('result') or {}
+        username = (user.get('core') or {}).get('screen_name') or (user.get('legacy') or {}).get('screen_name', '')
+
+        note = (((tweet.get('note_tweet') or {}).get('note_tweet_results') or {}).get('result') or {}).get('text')
+        # Text ranges count characters of the unescaped text
+        text = html.unescape(note or legacy.get('full_text', ''))
+        if not note and legacy.get('display_text_range'):
+            # Drop trailing media links the page does not show
+            start, end = legacy['display_text_range']
+            text = text[start:end]
+
+        tweet_id = tweet.get('rest_id') or legacy.get('id_str', '')
+        yield tweet_id, {
+            'platform': 'twitter',
+            'text': text,
+            'time': twitter_time(legacy.get('created_at')),
+            'username': username,
+            'likes': str(legacy.get('favorite_count', 0)),
+            'retweets': str(legacy.get('retweet_count', 0)),
+            'replies': str(legacy.get('reply_count', 0)),
+            'views': str((tweet.get('views') or {}).get('count', 0)),
+            'tweet_id': tweet_id,
+        }
+
+
+class TimelineCapture:
+    """Collects timeline API responses from a driver's performance log
+
+    Creating one drains whatever the log already holds, so only responses from
+    later navigation and scrolling are seen.
+    """
+
+    def __init__(self, driver, url_pattern=TWITTER_TIMELINE_PATTERN):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.pending = set()
+        driver.get_log('performance')
+
+    def responses(self):
+        """Parsed JSON bodies of the matching responses that finished loading since the last call"""
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                if self.url_pattern.search(params.get('response', {}).get('url', '')):
+                    self.pending.add(params.get('requestId'))
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self.pending:
+                self.pending.discard(params['requestId'])
+                finished.append(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                self.pending.discard(params.get('requestId'))
+
+        payloads = []
+        for request_id in finished:
+            try:
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                content = body.get('body', '')
+                if body.get('base64Encoded'):
+                    content = base64.b64decode(content).decode('utf-8')
+                payloads.append(json.loads(content))
+            except Exception as e:
+                logger.warning("Could not read timeline response %s: %s", request_id, e)
+        return payloads
+
+
+class ScrollEngine:
+    """Drives an infinite-scroll feed, waiting on DOM growth instead of fixed sleeps
+
+    The wait after each scroll adapts to how long new content has been taking to
+    show up, and the feed is considered exhausted after idle_limit scrolls in a row
+    that yielded nothing new.
+
+    With max_heap_mb set (long-scroll mode) items() ends early with recycle=True once
+    the page's JS heap passes it; prune additionally removes extracted nodes.
+    """
+
+    def __init__(self, driver, item_selector, min_wait=SCROLL_MIN_WAIT, max_wait=SCROLL_MAX_WAIT,
+                 idle_limit=SCROLL_IDLE_LIMIT, step='bottom', max_heap_mb=None, prune=False, platform=''):
+        self.driver = driver
+        self.platform = platform
+        self.step = step
+        self.item_selector = item_selector + UNSCRAPED
+        self.max_heap_mb = max_heap_mb
+        self.prune_selector = f'{item_selector}[{SCRAPED_ATTR}]' if prune else None
+        self.progressed = False
+        self.recycle = False
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.idle_limit = idle_limit
+        self.latency = None
+        self.last_height = 0
+        self.idle = 0
+        self.scrolls = 0
+        self.stopped = False
+
+    def stop(self):
+        """Finish after the current batch (e.g. once already-known items show up)"""
+        self.stopped = True
+
+    def note_progress(self):
+        """Count this step as progress even if extract() found nothing new (e.g. when
+        scrolling back past items seen before a restart)"""
+        self.progressed = True
+
+    def housekeep(self):
+        """Prune extracted nodes and check the heap; True when the browser should be recycled"""
+        state = self.driver.execute_script(PRUNE_SCRIPT, self.prune_selector) or {}
+        if self.prune_selector:
+            self.last_height = state.get('height', 0)
+        heap_mb = (state.get('heap') or 0) / (1024 * 1024)
+        return heap_mb >= self.max_heap_mb
+
+    def wait_for_items(self, timeout, action='none', baseline=0):
+        """Wait (optionally after scrolling) until new item nodes appear; returns True if they did"""
+        with phase(self.platform, 'scroll_wait'):
+            state = self.driver.execute_async_script(
+                SCROLL_WAIT_SCRIPT, self.item_selector, self.last_height, int(timeout * 1000), action, baseline
+            )
+        self.last_height = state['height']
+        if state['grown']:
+            elapsed = state['elapsed'] / 1000
+            # Exponential moving average of how long new content takes to arrive
+            self.latency = elapsed if self.latency is None else 0.7 * self.latency + 0.3 * elapsed
+        return state['grown']
+
+    def next_timeout(self):
+        # After an empty scroll give slow pages the full ceiling before giving up
+        if self.idle or self.latency is None:
+            return time_left(self.max_wait)
+        return time_left(min(self.max_wait, max(self.min_wait, self.latency * 3)))
+
+    def scroll(self):
+        """Scroll to the bottom (or one screenful for step='viewport') and wait for new items"""
+        self.scrolls += 1
+        if self.step == 'viewport':
+            return self.wait_for_items(self.next_timeout(), 'viewport')
+        return self.wait_for_items(self.next_timeout(), 'bottom', baseline=-1)
+
+    def items(self, extract, limit):
+        """Yield items from extract() (called once per scroll step) until limit or the feed dries up
+
+        extract() must return only new, deduplicated items.
+        """
+        yielded = 0
+        while yielded < limit:
+            try:
+                with phase(self.platform, 'extract'):
+                    batch = extract()
+            except Exception as e:
+                logger.warning("Error extracting items after scroll %s: %s", self.scrolls, e)
+                batch = []
+
+            for item in batch:
+                item_scraped(item, self.platform, 'browser')
+                yield item
+                yielded += 1
+                if yielded >= limit:
+                    return
+
+            if self.stopped:
+                return
+            if deadline_expired():
+                logger.info("Deadline reached or scrape cancelled after %s scrolls, stopping at %s", self.scrolls, yielded)
+                return
+
+            if self.max_heap_mb:
+                try:
+                    with phase(self.platform, 'housekeep'):
+                        recycle = self.housekeep()
+                    if recycle:
+                        self.recycle = True
+                        return
+                except WebDriverException:
+                    raise
+                except Exception as e:
+                    logger.warning("Long-scroll housekeeping failed: %s", e)
+
+            self.idle = 0 if batch or self.progressed else self.idle + 1
+            self.progressed = False
+            if self.idle >= self.idle_limit:
+                logger.info("No new items after %s scrolls, stopping at %s", self.idle, yielded)
+                return
+
+            try:
+                self.scroll()
+            except WebDriverException:
+                raise
+            except Exception as e:
+                logger.warning("Error while scrolling: %s", e)
+
+
+class CacheEntry:
+    def __init__(self, items, size):
+        self.items = items
+        self.size = size
+        self.stored_at = time.monotonic()
+
+
+class ResultCache:
+    """Bounded in-process cache of scrape results with TTL expiry and LRU eviction
+
+    Expired entries are kept (until evicted) so they can seed an incremental refresh.
+    """
+
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES,
+                 max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._counters = {'hits': 0, 'misses': 0, 'stale_hits': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(platform, query, count, variant=''):
+        """variant separates results that differ by how they were scraped (extraction, engine)"""
+        return (platform, ' '.join(str(query).lower().split()), int(count), variant or '')
+
+    def fresh(self, key):
+        """Items of a fresh entry (counted as a hit), else None without counting a lookup"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at > self.ttl:
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return entry.items
+
+    def lookup(self, key):
+        """Return (items, fresh) for key, or (None, False) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters['misses'] += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry.stored_at <= self.ttl:
+                self._counters['hits'] += 1
+                return entry.items, True
+            self._counters['stale_hits'] += 1
+            return entry.items, False
+
+    def put(self, key, items):
+        size = len(json.dumps(items).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old.size
+            self._entries[key] = CacheEntry(items, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._counters['evictions'] += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses'] + self._counters['stale_hits']
+            return dict(
+                self._counters,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+                ttl=self.ttl,
+                hit_ratio=round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+            )
+
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    platform TEXT NOT NULL,
+    text TEXT NOT NULL,
+    author TEXT NOT NULL,
+    url TEXT NOT NULL,
+    posted_at REAL NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_platform_posted ON items (platform, posted_at);
+CREATE INDEX IF NOT EXISTS items_posted ON items (posted_at);
+"""
+
+# External-content FTS index over item text and author, kept in step by triggers
+STORE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(text, author, content='items', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, text, author) VALUES (new.rowid, new.text, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, text, author) VALUES ('delete', old.rowid, old.text, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, text, author) VALUES ('delete', old.rowid, old.text, old.author);
+    INSERT INTO items_fts (rowid, text, author) VALUES (new.rowid, new.text, new.author);
+END;
+"""
+
+# First sighting is kept: relative ages ('3 days ago') only get vaguer on later scrapes
+STORE_UPSERT = """
+INSERT INTO items (id, platform, text, author, url, posted_at, first_seen, last_seen, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    text = excluded.text, author = excluded.author, url = excluded.url,
+    last_seen = excluded.last_seen, data = excluded.data
+"""
+
+
+def stored_item_id(item):
+    """Stable id for a scraped item, the same whichever engine or extraction produced it"""
+    platform = item.get('platform', '')
+    if platform == 'youtube':
+        video_id = parse_youtube_video_id(item.get('video_url', ''))
+        if video_id:
+            return f'youtube:{video_id}'
+        parts = (item.get('channel', ''), item.get('title', ''))
+    elif platform == 'youtube_comment':
+        if item.get('comment_id'):
+            return f"youtube_comment:{item['comment_id']}"
+        parts = (parse_youtube_video_id(item.get('video_url', '')) or '', item.get('author', ''), item.get('text', ''))
+    else:
+        # Every extraction reads the status id from the permalink when there is one
+        if item.get('tweet_id'):
+            return f"twitter:{item['tweet_id']}"
+        parts = (item.get('username', ''), item.get('text', ''))
+    return f"{platform}:{hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()}"
+
+
+def parse_timestamp(value):
+    """ISO-8601 string (as parse_age returns) or epoch seconds -> epoch seconds, else None"""
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class ResultStore:
+    """SQLite copy of every scraped item, written in batches by a background thread
+
+    Searches open their own connection, so they never wait behind the writer (WAL mode).
+    """
+
+    def __init__(self, path=STORE_PATH, batch_size=STORE_BATCH_SIZE,
+                 flush_interval=STORE_FLUSH_INTERVAL, queue_size=STORE_QUEUE_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(STORE_SCHEMA)
+            try:
+                conn.executescript(STORE_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                logger.warning("SQLite has no FTS5, stored searches fall back to LIKE: %s", e)
+                self.fts = False
+        threading.Thread(target=self._write_loop, name='result-store', daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, item):
+        """Queue an item for the writer; never blocks the scrape"""
+        try:
+            self._queue.put_nowait((item, time.time()))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning("Result store queue full, %s items dropped so far", self.dropped)
+
+    def flush(self):
+        """Wait until everything queued so far is written"""
+        self._queue.join()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            flush_at = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, flush_at - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(STORE_UPSERT, [self._row(item, seen) for item, seen in batch])
+                self.written += len(batch)
+            except Exception as e:
+                logger.error("Result store write of %s items failed: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @staticmethod
+    def _row(item, seen):
+        platform = item.get('platform', '')
+        times = TYPED_FIELDS.get(platform, {}).get('times', [])
+        posted = parse_timestamp(parse_age(item.get(times[0]), seen)) if times else None
+        text = item.get('title', '') if platform == 'youtube' else item.get('text', '')
+        author = item.get('channel') or item.get('author') or item.get('username') or ''
+        data = json.dumps(item, ensure_ascii=False)
+        return (stored_item_id(item), platform, text, author, item.get('video_url', ''),
+                seen if posted is None else posted, seen, seen, data)
+
+    def search(self, query='', platform=None, since=None, until=None, limit=50):
+        """Stored items matching every word of query, newest first (best match first with a query)
+
+        since/until (epoch seconds) bound the post time, or the first sighting
+        when the page gave none.
+        """
+        join, where, params = '', [], []
+        order = 'items.posted_at DESC'
+        if query and self.fts:
+            # Each word quoted, so user input is never parsed as FTS syntax
+            join = ' JOIN items_fts ON items_fts.rowid = items.rowid'
+            where.append('items_fts MATCH ?')
+            params.append(' '.join('"{}"'.format(term.replace('"', '""')) for term in query.split()))
+            order = 'bm25(items_fts), ' + order
+        elif query:
+            for term in query.split():
+                where.append('(items.text LIKE ? OR items.author LIKE ?)')
+                params.extend([f'%{term}%'] * 2)
+        if platform:
+            where.append('items.platform = ?')
+            params.append(platform)
+        if since is not None:
+            where.append('items.posted_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('items.posted_at < ?')
+            params.append(until)
+
+        sql = 'SELECT items.* FROM items' + join
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' ORDER BY {order} LIMIT ?'
+        params.append(limit)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        results = []
+        for row in rows:
+            item = json.loads(row['data'])
+            item['stored'] = {
+                'id': row['id'],
+                'posted_at': row['posted_at'],
+                'first_seen': row['first_seen'],
+                'last_seen': row['last_seen'],
+            }
+            results.append(item)
+        return results
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            counts = dict(conn.execute('SELECT platform, COUNT(*) FROM items GROUP BY platform').fetchall())
+        return {
+            'path': self.path,
+            'fts': self.fts,
+            'items': counts,
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """The process-wide ResultStore, or None when STORE_PATH is empty or unusable"""
+    global _store
+    if not STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ResultStore()
+            except sqlite3.Error as e:
+                logger.error("Result store %s unavailable: %s", STORE_PATH, e)
+                return None
+            atexit.register(_store.flush)
+        return _store
+
+def item_scraped(item, platform, engine):
+    """Count an item leaving a scraper and queue it for the result store"""
+    SCRAPED_ITEMS.inc(platform=platform, engine=engine)
+    store = get_store()
+    if store:
+        store.add(item)
+
+
+def available_memory_mb():
+    """Memory this container can still use: cgroup limit minus usage, else MemAvailable"""
+    for limit_path, usage_path in (
+        ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'),
+        ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes'),
+    ):
+        try:
+            with open(limit_path) as f:
+                limit = f.read().strip()
+            with open(usage_path) as f:
+                usage = int(f.read().strip())
+            # cgroup v1 reports "no limit" as a huge number
+            if limit != 'max' and int(limit) < 1 << 50:
+                return max(0, int(limit) - usage) // (1024 * 1024)
+        except (OSError, ValueError):
+            continue
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+_comment_tab_slots = None
+_comment_tab_slots_lock = threading.Lock()
+
+def comment_tab_slots():
+    """Process-wide cap on open comment tabs, sized once from the container's memory"""
+    global _comment_tab_slots
+    with _comment_tab_slots_lock:
+        if _comment_tab_slots is None:
+            limit = COMMENT_BATCH_MAX_TABS
+            if not limit:
+                memory = available_memory_mb()
+                limit = max(1, memory // COMMENT_TAB_MEMORY_MB) if memory else (
+                    COMMENT_BATCH_BROWSERS * COMMENT_BATCH_TABS_PER_BROWSER
+                )
+            logger.info("Comment batch tab limit: %s", limit)
+            _comment_tab_slots = threading.BoundedSemaphore(limit)
+        return _comment_tab_slots
+
+
+def tweet_identity(tweet_data):
+    return (tweet_data['username'], tweet_data['text'])
+
+
+def is_twitter_login_url(url):
+    return '/login' in url or '/i/flow/' in url
+
+
+def mark_scraped(driver, elements):
+    """Flag extracted nodes in the page so the next pass skips them"""
+    if elements:
+        driver.execute_script(
+            "var attr = arguments[1]; arguments[0].forEach(function (el) { el.setAttribute(attr, '1'); });",
+            elements, SCRAPED_ATTR
+        )
+
+
+def parse_youtube_video_id(url):
+    match = re.search(r'[?&]v=([\w-]+)', url or '') or re.search(r'(?:/shorts/|youtu\.be/)([\w-]+)', url or '')
+    return match.group(1) if match else None
+
+
+def parse_youtube_comment_id(url):
+    match = re.search(r'[?&]lc=([\w.-]+)', url or '')
+    return match.group(1) if match else None
+
+
+def classify_youtube_metadata(texts, video_data):
+    """Sort metadata-line texts into views and upload time"""
+    for text in texts:
+        if text:
+            if 'view' in text.lower():
+                video_data['views'] = text
+            elif any(word in text.lower() for word in ['ago', 'day', 'week', 'month', 'year', 'hour', 'minute']):
+                video_data['upload_time'] = text
+
+
+COUNT_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([KMB])?\b', re.IGNORECASE)
+COUNT_MULTIPLIERS = {'': 1, 'K': 1000, 'M': 1000 ** 2, 'B': 1000 ** 3}
+AGE_PATTERN = re.compile(r'(\d+)\s*(second|minute|hour|day|week|month|year)s?\s+ago', re.IGNORECASE)
+AGE_SECONDS = {
+    'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400,
+    'week': 7 * 86400, 'month': 30 * 86400, 'year': 365 * 86400,
+}
+
+
+def parse_count(value):
+    """'1.2K' -> 1200, '3,456' -> 3456, '1.2M views' -> 1200000, 'No views' -> 0; None if there is no number"""
+    if isinstance(value, int):
+        return value
+    text = str(value or '').strip()
+    if text.lower().startswith('no '):
+        return 0
+    match = COUNT_PATTERN.search(text)
+    if not match:
+        return None
+    number = float(match.group(1).replace(',', ''))
+    return int(round(number * COUNT_MULTIPLIERS[(match.group(2) or '').upper()]))
+
+
+def parse_age(value, now=None):
+    """'3 days ago' / 'Streamed 2 weeks ago' -> UTC timestamp; ISO timestamps pass through, else None"""
+    text = str(value or '').strip()
+    if re.match(r'\d{4}-\d{2}-\d{2}T', text):
+        return text
+    match = AGE_PATTERN.search(text)
+    if not match:
+        return None
+    now = time.time() if now is None else now
+    seconds = int(match.group(1)) * AGE_SECONDS[match.group(2).lower()]
+    return datetime.fromtimestamp(now - seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def normalize_item(item, now=None):
+    """Copy of a scraped item with its count and age fields typed (see TYPED_FIELDS)"""
+    fields = TYPED_FIELDS.get(item.get('platform'))
+    if not fields:
+        return item
+    item = dict(item)
+    for field in fields['counts']:
+        if field in item:
+            item[field] = parse_count(item[field])
+    if item.get('platform') == 'youtube_comment' and item.get('likes') is None:
+        # YouTube shows no number for a comment without likes, as both engines record it
+        item['likes'] = 0
+    for field in fields['times']:
+        if field in item:
+            item[field] = parse_age(item[field], now)
+    return item
+
+
+def to_columns(items):
+    """Row dicts -> {'count', 'columns': {field: [values]}}; fields missing from a row are null"""
+    columns = {}
+    for index, item in enumerate(items):
+        for field in item:
+            if field not in columns:
+                columns[field] = [None] * index
+        for field, values in columns.items():
+            values.append(item.get(field))
+    return {'count': len(items), 'columns': columns}
+
+
+_chrome_paths = None
+_chrome_paths_error = None
+_chrome_paths_lock = threading.Lock()
+
+def resolve_chrome_paths():
+    """(chromedriver path, Chrome binary or None), looked up once per process
+
+    A failed lookup is remembered too, so an offline box does not retry the
+    download on every browser start.
+    """
+    global _chrome_paths, _chrome_paths_error
+    with _chrome_paths_lock:
+        if _chrome_paths is None and _chrome_paths_error is None:
+            try:
+                binary = CHROME_BIN if CHROME_BIN and os.path.isfile(CHROME_BIN) else None
+                if CHROMEDRIVER_PATH and os.access(CHROMEDRIVER_PATH, os.X_OK):
+                    driver_path, source = CHROMEDRIVER_PATH, 'CHROMEDRIVER_PATH'
+                elif shutil.which('chromedriver'):
+                    driver_path, source = shutil.which('chromedriver'), 'PATH'
+                else:
+                    # Last resort, needs network access on first use
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    driver_path, source = ChromeDriverManager().install(), 'webdriver-manager'
+            except Exception as e:
+                logger.error("No chromedriver available: %s", e)
+                _chrome_paths_error = str(e)
+            else:
+                logger.info("Using chromedriver %s (from %s), Chrome binary %s",
+                            driver_path, source, binary or 'auto-detected')
+                _chrome_paths = (driver_path, binary)
+        if _chrome_paths_error is not None:
+            raise ScraperError(f"No chromedriver available: {_chrome_paths_error}")
+        return _chrome_paths
+
+
 class SocialMediaScraper:
     def __init__(self, twitter_username=None, twitter_password=None):
         self.twitter_username = twitter_username
@@ -28,33 +2148,128 @@ class SocialMediaScraper:
         self.chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         self.chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         self.chrome_options.add_experimental_option('useAutomationExtension', False)
-        self.chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        self.chrome_options.add_argument(f'--user-agent={USER_AGENT}')
         # Add these options for better YouTube compatibility
         self.chrome_options.add_argument('--disable-web-security')
         self.chrome_options.add_argument('--allow-running-insecure-content')
         self.chrome_options.add_argument('--disable-features=VizDisplayCompositor')
-        self.service = Service(ChromeDriverManager().install())
+        self.twitter_session = TwitterSession()
+        self.youtube_plan = SelectorPlan(YOUTUBE_VIDEO_FIELDS)
+        self.cache = ResultCache()
+        self.youtube_http = YouTubeHttpClient()
+        self.pool = DriverPool(self._create_driver)
+        self.pool.warm_in_background()
+
+    def _create_driver(self, platform, page_load='normal'):
+        # Resolved on the first browser start, so browserless routes never need chromedriver
+        driver_path, binary = resolve_chrome_paths()
+        if binary:
+            self.chrome_options.binary_location = binary
+        options = self.chrome_options
+        if page_load != options.page_load_strategy or platform == 'twitter':
+            options = copy.deepcopy(self.chrome_options)
+            options.page_load_strategy = page_load
+        if platform == 'twitter':
+            # Network events only, for TimelineCapture
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+        with phase(platform, 'driver_start'):
+            driver = webdriver.Chrome(service=Service(executable_path=driver_path), options=options)
+        mark_ready()
+        count_webdriver_commands(driver)
+        # Add stealth settings (registered for every new document so reused drivers keep them)
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': STEALTH_SCRIPT})
+        except Exception:
+            pass
+        driver.execute_script(STEALTH_SCRIPT)
+        return driver
+
+    @contextmanager
+    def browser(self, platform, profile=RESOURCE_PROFILE):
+        """Check out a pooled driver set up for the named resource profile"""
+        settings = RESOURCE_PROFILES[profile]
+        started = time.perf_counter()
+        # A request deadline also bounds the wait for a free browser
+        with self.pool.driver(platform, time_left(DRIVER_CHECKOUT_TIMEOUT), settings['page_load']) as driver:
+            record_phase(platform, 'driver_checkout', time.perf_counter() - started)
+            # Set on every checkout, since a reused driver still has the last request's limit
+            driver.set_page_load_timeout(max(1.0, time_left(DRIVER_PAGE_LOAD_TIMEOUT)))
+            # Blocking is per-session state, so reused drivers get it set every time
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': settings['block']})
+            except WebDriverException as e:
+                if settings['block']:
+                    logger.warning("Could not apply resource profile %s: %s", profile, e)
+            yield driver
 
     def twitter_login(self, driver):
         try:
-            driver.get('https://twitter.com/login')
-            time.sleep(3)
-            username_field = WebDriverWait(driver, 10).until(
+            driver.get(f'{TWITTER_BASE_URL}/login')
+            username_field = WebDriverWait(driver, time_left(10)).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[autocomplete="username"]'))
             )
             username_field.send_keys(self.twitter_username)
             username_field.send_keys(Keys.RETURN)
-            time.sleep(2)
-            password_field = WebDriverWait(driver, 10).until(
+            password_field = WebDriverWait(driver, time_left(10)).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'input[name="password"]'))
             )
             password_field.send_keys(self.twitter_password)
             password_field.send_keys(Keys.RETURN)
-            time.sleep(5)
+            # Logged in once the auth cookie shows up
+            WebDriverWait(driver, time_left(15)).until(lambda d: d.get_cookie(TWITTER_AUTH_COOKIE))
             return True
         except Exception as e:
-            print(f"Twitter login error: {str(e)}")
+            logger.warning("Twitter login error: %s", e)
+            return False
+
+    def driver_has_twitter_session(self, driver):
+        """Check the browser's cookie jar for a live auth cookie without loading a page"""
+        try:
+            cookies = driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception:
+            return False
+        host = urlparse(TWITTER_BASE_URL).hostname or 'x.com'
+        return has_live_auth_cookie(
+            [c for c in cookies if c.get('domain', '').lstrip('.') in host or 'twitter.com' in c.get('domain', '')]
+        )
+
+    def ensure_twitter_session(self, driver, force_login=False):
+        """Log driver in, reusing the driver's or the saved session when possible"""
+        if not force_login:
+            if self.driver_has_twitter_session(driver):
+                return True
+            if self.twitter_session.is_valid():
+                try:
+                    self.twitter_session.apply(driver)
+                    return True
+                except Exception as e:
+                    logger.warning("Could not restore Twitter session: %s", e)
+
+        if not self.twitter_login(driver):
+            return False
+        try:
+            self.twitter_session.save(driver)
+        except Exception as e:
+            logger.warning("Could not save Twitter session: %s", e)
+        return True
+
+    def open_twitter_page(self, driver, url):
+        """Navigate to a Twitter page, logging in again if the session turns out to be expired"""
+        driver.get(url)
+        if not is_twitter_login_url(driver.current_url):
+            return True
+        logger.warning("Twitter session expired, logging in again")
+        self.twitter_session.invalidate()
+        try:
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        except Exception:
+            driver.delete_all_cookies()
+        if not self.ensure_twitter_session(driver, force_login=True):
             return False
+        driver.get(url)
+        return not is_twitter_login_url(driver.current_url)
 
     def extract_twitter_engagement_metrics(self, tweet_element):
         """Extract likes, retweets, replies, and views from tweet element"""
@@ -67,7 +2282,7 @@ class SocialMediaScraper:
         
         try:
             # Method 1: Try to get metrics from aria-label attributes
-            engagement_buttons = tweet_element.find_elements(By.CSS_SELECTOR, 'div[role="group"] > div')
+            engagement_buttons = tweet_element.find_elements(By.CSS_SELECTOR, TWEET_SELECTORS['engagement'])
             
             for button in engagement_buttons:
                 try:
@@ -91,7 +2306,7 @@ class SocialMediaScraper:
             
             # Method 2: Try alternative selectors for engagement metrics
             if metrics['likes'] == '0':
-                like_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'button[data-testid="like"] span, div[data-testid="like"] span')
+                like_elements = tweet_element.find_elements(By.CSS_SELECTOR, TWEET_SELECTORS['likes'])
                 for elem in like_elements:
                     text = elem.text.strip()
                     if text and text.isdigit():
@@ -99,7 +2314,7 @@ class SocialMediaScraper:
                         break
             
             if metrics['retweets'] == '0':
-                retweet_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'button[data-testid="retweet"] span, div[data-testid="retweet"] span')
+                retweet_elements = tweet_element.find_elements(By.CSS_SELECTOR, TWEET_SELECTORS['retweets'])
                 for elem in retweet_elements:
                     text = elem.text.strip()
                     if text and (text.isdigit() or 'K' in text or 'M' in text):
@@ -107,7 +2322,7 @@ class SocialMediaScraper:
                         break
             
             if metrics['replies'] == '0':
-                reply_elements = tweet_element.find_elements(By.CSS_SELECTOR, 'button[data-testid="reply"] span, div[data-testid="reply"] span')
+                reply_elements = tweet_element.find_elements(By.CSS_SELECTOR, TWEET_SELECTORS['replies'])
                 for elem in reply_elements:
                     text = elem.text.strip()
                     if text and (text.isdigit() or 'K' in text or 'M' in text):
@@ -115,105 +2330,220 @@ class SocialMediaScraper:
                         break
                         
         except Exception as e:
-            print(f"Error extracting Twitter engagement metrics: {str(e)}")
+            logger.warning("Error extracting Twitter engagement metrics: %s", e)
         
         return metrics
 
-    def scrape_tweets(self, search_term, num_tweets=50):
-        tweets = []
+    def extract_tweet_data(self, tweet):
+        """Extract one tweet with per-element WebDriver calls (fallback path)"""
+        # Extract tweet text
+        text_element = tweet.find_element(By.CSS_SELECTOR, TWEET_SELECTORS['text'])
+        text = text_element.text if text_element else ""
+        
+        # Extract timestamp
+        time_element = tweet.find_element(By.CSS_SELECTOR, TWEET_SELECTORS['time'])
+        time_tag = time_element.get_attribute('datetime') if time_element else ""
+        
+        # Extract username
+        username_element = tweet.find_element(By.CSS_SELECTOR, TWEET_SELECTORS['username'])
+        username = username_element.get_attribute('href').split('/')[-1] if username_element else ""
+
+        # Status id from the permalink around the timestamp, as TWEET_BATCH_SCRIPT reads it
         try:
-            driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
-            
-            # Add stealth settings
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            if not self.twitter_login(driver):
-                driver.quit()
-                return {"error": "Twitter login failed"}
+            link = time_element.find_element(By.XPATH, './ancestor::a[1]')
+        except NoSuchElementException:
+            link = None
+        status = re.search(r'/status/(\d+)', (link.get_attribute('href') or '') if link else '')
 
-            driver.get(f"https://x.com/search?q={search_term}&src=typed_query&f=live")
-            time.sleep(5)
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scroll_attempts = 20
+        # Extract engagement metrics using improved method
+        engagement_metrics = self.extract_twitter_engagement_metrics(tweet)
 
-            while len(tweets) < num_tweets and scroll_attempts < max_scroll_attempts:
-                try:
-                    tweet_elements = WebDriverWait(driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'article[data-testid="tweet"]'))
-                    )
+        return {
+            'platform': 'twitter',
+            'tweet_id': status.group(1) if status else '',
+            'text': text,
+            'time': time_tag,
+            'username': username,
+            'likes': engagement_metrics['likes'],
+            'retweets': engagement_metrics['retweets'],  
+            'replies': engagement_metrics['replies'],
+            'views': engagement_metrics['views']
+        }
 
-                    for tweet in tweet_elements:
-                        if len(tweets) >= num_tweets:
-                            break
-                        try:
-                            # Extract tweet text
-                            text_element = tweet.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                            text = text_element.text if text_element else ""
-                            
-                            # Extract timestamp
-                            time_element = tweet.find_element(By.TAG_NAME, 'time')
-                            time_tag = time_element.get_attribute('datetime') if time_element else ""
-                            
-                            # Extract username
-                            username_element = tweet.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"] a')
-                            username = username_element.get_attribute('href').split('/')[-1] if username_element else ""
-
-                            # Extract engagement metrics using improved method
-                            engagement_metrics = self.extract_twitter_engagement_metrics(tweet)
-
-                            tweet_data = {
-                                'platform': 'twitter',
-                                'text': text,
-                                'time': time_tag,
-                                'username': username,
-                                'likes': engagement_metrics['likes'],
-                                'retweets': engagement_metrics['retweets'],  
-                                'replies': engagement_metrics['replies'],
-                                'views': engagement_metrics['views']
-                            }
-
-                            # Check if this tweet is already in our list (avoid duplicates)
-                            tweet_exists = any(
-                                existing_tweet['text'] == tweet_data['text'] and 
-                                existing_tweet['username'] == tweet_data['username'] 
-                                for existing_tweet in tweets
-                            )
-                            
-                            if not tweet_exists and tweet_data['text']:
-                                tweets.append(tweet_data)
-                                print(f"Scraped tweet {len(tweets)}: {tweet_data['username']} - Likes: {tweet_data['likes']}, RTs: {tweet_data['retweets']}")
-                                
-                        except Exception as e:
-                            print(f"Error processing individual tweet: {str(e)}")
-                            continue
+    def extract_tweets_batch(self, driver):
+        """Extract every newly rendered tweet with a single execute_script round trip
 
-                    # Scroll down to load more tweets
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(3)
-                    
-                    new_height = driver.execute_script("return document.body.scrollHeight")
-                    if new_height == last_height:
-                        scroll_attempts += 1
-                        time.sleep(2)
-                    else:
-                        scroll_attempts = 0
-                        
-                    last_height = new_height
-                    
+        Returns (tweet_id, tweet_data) pairs; tweet_id is '' when the permalink is missing.
+        """
+        records = driver.execute_script(TWEET_BATCH_SCRIPT) or []
+        tweets = []
+        for record in records:
+            tweet_id = record.pop('status_id', '')
+            tweets.append((tweet_id, dict(record, platform='twitter', tweet_id=tweet_id)))
+        return tweets
+
+    def extract_tweets_network(self, driver, capture):
+        """Decode tweets from the timeline responses captured since the last call
+
+        Returns (tweet_id, tweet_data) pairs, like extract_tweets_batch.
+        """
+        records = []
+        for payload in capture.responses():
+            records.extend(timeline_tweets(payload))
+        driver.execute_script(MARK_ALL_SCRIPT, TWEET_SELECTORS['tweet'] + UNSCRAPED, SCRAPED_ATTR)
+        return records
+
+    def extract_tweets_per_element(self, driver):
+        tweet_elements = driver.find_elements(By.CSS_SELECTOR, TWEET_SELECTORS['tweet'] + UNSCRAPED)
+        records = []
+        extracted = []
+        for tweet in tweet_elements:
+            try:
+                tweet_data = self.extract_tweet_data(tweet)
+            except Exception as e:
+                logger.debug("Error processing individual tweet: %s", e)
+                continue
+            records.append((tweet_data['tweet_id'], tweet_data))
+            if tweet_data['text']:
+                extracted.append(tweet)
+        mark_scraped(driver, extracted)
+        return records
+
+    def iter_tweets(self, search_term, num_tweets=50, extraction=TWEET_EXTRACTION, stop_at=None, profile=RESOURCE_PROFILE):
+        """Yield tweets for search_term as they are scraped
+
+        The search uses the live (newest first) feed, so with stop_at (a set of
+        tweet_identity keys already known) scrolling ends at the first known tweet.
+        In long-scroll mode a recycled browser resumes the search below the oldest
+        tweet id seen (max_id:).
+        """
+        long_scroll = num_tweets >= LONG_SCROLL_ITEMS
+        progress = {'count': 0, 'oldest_id': None, 'seen': set(), 'restarts': 0}
+        while progress['count'] < num_tweets:
+            before = progress['count']
+            with self.browser('twitter', profile) as driver:
+                recycle = yield from self._scroll_tweets(
+                    driver, search_term, num_tweets, extraction, stop_at, progress, long_scroll
+                )
+                if recycle:
+                    self.pool.retire(driver)
+            if not recycle or deadline_expired():
+                break
+            if progress['count'] == before:
+                logger.warning("Fresh browser ran out of memory before reaching new tweets, stopping at %s", before)
+                break
+            progress['restarts'] += 1
+            logger.info("Restarting Twitter browser after %s tweets to free memory", progress['count'])
+
+    def _scroll_tweets(self, driver, search_term, num_tweets, extraction, stop_at, progress, long_scroll):
+        """One browser session of iter_tweets; returns True if it stopped to recycle the browser"""
+        with phase('twitter', 'login'):
+            logged_in = self.ensure_twitter_session(driver)
+        if not logged_in:
+            raise ScraperError("Twitter login failed")
+
+        capture = None
+        if extraction == 'network':
+            try:
+                capture = TimelineCapture(driver)
+            except Exception as e:
+                logger.warning("Network tweet extraction unavailable, falling back to batch: %s", e)
+                extraction = 'batch'
+
+        query = search_term
+        if progress['oldest_id']:
+            query = f"{search_term} max_id:{progress['oldest_id'] - 1}"
+        with phase('twitter', 'navigate'):
+            opened = self.open_twitter_page(driver, f"{TWITTER_BASE_URL}/search?q={quote_plus(query)}&src=typed_query&f=live")
+        if not opened:
+            raise ScraperError("Twitter login failed")
+
+        # X virtualizes its timeline itself, so tweets are not pruned, only the heap is watched
+        engine = ScrollEngine(
+            driver, TWEET_SELECTORS['tweet'], max_heap_mb=LONG_SCROLL_MAX_HEAP_MB if long_scroll else None,
+            platform='twitter'
+        )
+        if not engine.wait_for_items(time_left(15)):
+            logger.info("No tweets rendered for: %s", query)
+
+        seen = progress['seen']
+        mode = {'extraction': extraction}
+
+        def extract():
+            if mode['extraction'] == 'network':
+                candidates = self.extract_tweets_network(driver, capture)
+            else:
+                # Twitter drivers always record network events (the pool cannot tell which
+                # extraction a request will use), so drop them every step rather than let
+                # chromedriver buffer them for the whole scroll
+                driver.get_log('performance')
+            if mode['extraction'] == 'batch':
+                try:
+                    candidates = self.extract_tweets_batch(driver)
                 except Exception as e:
-                    print(f"Error in Twitter scroll iteration: {str(e)}")
-                    scroll_attempts += 1
-                    time.sleep(2)
+                    logger.warning("Batch tweet extraction failed, falling back to per-element: %s", e)
+                    mode['extraction'] = 'element'
+            if mode['extraction'] not in ('batch', 'network'):
+                candidates = self.extract_tweets_per_element(driver)
 
-            driver.quit()
+            tweets = []
+            for status_id, tweet_data in candidates:
+                if stop_at and tweet_identity(tweet_data) in stop_at:
+                    engine.stop()
+                    break
+                # Check if this tweet is already scraped (avoid duplicates)
+                key = status_id or tweet_identity(tweet_data)
+                if key in seen and progress['restarts']:
+                    engine.note_progress()
+                if key not in seen and tweet_data['text']:
+                    seen.add(key)
+                    tweets.append(tweet_data)
+                    if status_id.isdigit():
+                        oldest = progress['oldest_id']
+                        progress['oldest_id'] = int(status_id) if oldest is None else min(oldest, int(status_id))
             return tweets
-            
-        except Exception as e:
-            if 'driver' in locals():
-                driver.quit()
-            return {"error": str(e)}
+
+        for tweet_data in engine.items(extract, num_tweets - progress['count']):
+            progress['count'] += 1
+            logger.debug("Scraped tweet %s: %s - Likes: %s, RTs: %s",
+                         progress['count'], tweet_data['username'], tweet_data['likes'], tweet_data['retweets'])
+            yield tweet_data
+        return engine.recycle
+
+    def iter_tweets_cached(self, search_term, num_tweets=50, extraction=TWEET_EXTRACTION, profile=RESOURCE_PROFILE):
+        """iter_tweets through the result cache
+
+        A stale entry is refreshed incrementally: only tweets newer than the cached
+        ones are scraped, then the cached tweets fill up the rest.
+        """
+        key = ResultCache.key('twitter', search_term, num_tweets, extraction)
+        cached, fresh = self.cache.lookup(key)
+        if fresh:
+            yield from cached
+            return
+
+        stop_at = {tweet_identity(tweet) for tweet in cached} if cached else None
+        tweets = []
+        for tweet in self.iter_tweets(search_term, num_tweets, extraction, stop_at=stop_at, profile=profile):
+            tweets.append(tweet)
+            yield tweet
+
+        if cached:
+            new = {tweet_identity(tweet) for tweet in tweets}
+            for tweet in cached:
+                if len(tweets) >= num_tweets:
+                    break
+                if tweet_identity(tweet) not in new:
+                    tweets.append(tweet)
+                    yield tweet
+        # A scrape cut short by its deadline is not a complete answer for the next caller
+        if not deadline_hit():
+            self.cache.put(key, tweets)
+
+    def scrape_tweets(self, search_term, num_tweets=50, extraction=TWEET_EXTRACTION, use_cache=False, profile=RESOURCE_PROFILE):
+        source = self.iter_tweets_cached if use_cache else self.iter_tweets
+        tweets, error = collect_items(source(search_term, num_tweets, extraction, profile=profile))
+        return {"error": error} if error and not tweets else tweets
 
     def extract_youtube_video_data(self, video_element):
         """Extract video data from YouTube video element"""
@@ -232,13 +2562,7 @@ class SocialMediaScraper:
         try:
             # Multiple methods to extract title and URL
             title_element = None
-            title_selectors = [
-                'a#video-title',
-                'h3 a',
-                'h3.ytd-video-renderer a',
-                '.ytd-video-renderer h3 a',
-                'a[href*="/watch?v="]'
-            ]
+            title_selectors = YOUTUBE_VIDEO_FIELDS['title']['selectors']
             
             for selector in title_selectors:
                 try:
@@ -251,14 +2575,7 @@ class SocialMediaScraper:
                     continue
             
             # Extract channel name with multiple selectors
-            channel_selectors = [
-                'a.yt-simple-endpoint.style-scope.yt-formatted-string',
-                '.ytd-channel-name a',
-                '#channel-name a',
-                '.ytd-video-owner-renderer a',
-                'a[href*="/channel/"]',
-                'a[href*="/@"]'
-            ]
+            channel_selectors = YOUTUBE_VIDEO_FIELDS['channel']['selectors']
             
             for selector in channel_selectors:
                 try:
@@ -270,33 +2587,19 @@ class SocialMediaScraper:
                     continue
             
             # Extract metadata (views and upload time)
-            metadata_selectors = [
-                'span.style-scope.ytd-video-meta-block',
-                '#metadata-line span',
-                '.ytd-video-meta-block span'
-            ]
+            metadata_selectors = YOUTUBE_VIDEO_FIELDS['metadata']['selectors']
             
             for selector in metadata_selectors:
                 try:
                     metadata_elements = video_element.find_elements(By.CSS_SELECTOR, selector)
-                    for elem in metadata_elements:
-                        text = elem.text.strip()
-                        if text:
-                            if 'view' in text.lower():
-                                video_data['views'] = text
-                            elif any(word in text.lower() for word in ['ago', 'day', 'week', 'month', 'year', 'hour', 'minute']):
-                                video_data['upload_time'] = text
+                    classify_youtube_metadata([elem.text.strip() for elem in metadata_elements], video_data)
                     if video_data['views'] != '0' and video_data['upload_time']:
                         break
                 except:
                     continue
             
             # Extract duration with multiple selectors
-            duration_selectors = [
-                'span.ytd-thumbnail-overlay-time-status-renderer',
-                '.badge-shape-wiz__text',
-                'span.style-scope.ytd-thumbnail-overlay-time-status-renderer'
-            ]
+            duration_selectors = YOUTUBE_VIDEO_FIELDS['duration']['selectors']
             
             for selector in duration_selectors:
                 try:
@@ -319,316 +2622,1754 @@ class SocialMediaScraper:
                 pass
                     
         except Exception as e:
-            print(f"Error extracting YouTube video data: {str(e)}")
+            logger.warning("Error extracting YouTube video data: %s", e)
         
         return video_data
 
-    def scrape_youtube_videos(self, search_term, num_videos=50):
+    def extract_youtube_videos_batch(self, driver, video_elements):
+        """Extract a batch of video cards with one selector-plan call"""
         videos = []
+        for values in self.youtube_plan.run(driver, video_elements, SCRAPED_ATTR, 'title'):
+            video_data = {
+                'platform': 'youtube',
+                'title': '',
+                'channel': '',
+                'views': '0',
+                'upload_time': '',
+                'duration': '',
+                'thumbnail': '',
+                'video_url': '',
+                'description': ''
+            }
+            if values.get('title'):
+                video_data['title'] = values['title']['text']
+                video_data['video_url'] = values['title']['href']
+            video_data['channel'] = values.get('channel') or ''
+            classify_youtube_metadata(values.get('metadata') or [], video_data)
+            video_data['duration'] = values.get('duration') or ''
+            video_data['thumbnail'] = values.get('thumbnail') or ''
+            videos.append(video_data)
+        return videos
+
+    def find_new_video_elements(self, driver):
+        """Wait for the unscraped cards on screen to finish lazy rendering, then return them"""
+        return driver.execute_async_script(
+            VIEWPORT_BATCH_SCRIPT,
+            [selector + UNSCRAPED for selector in YOUTUBE_VIDEO_CONTAINERS],
+            YOUTUBE_LAZY_READY,
+            int(YOUTUBE_SETTLE_TIMEOUT * 1000)
+        ) or []
+
+    def iter_youtube_videos(self, search_term, num_videos=50, engine=YOUTUBE_ENGINE, profile=RESOURCE_PROFILE,
+                            sort='relevance'):
+        """Yield YouTube search results for search_term as they are scraped
+
+        engine: 'http' (no browser), 'browser', or 'auto' (http, falling back to
+        Chrome when the page cannot be parsed). profile names the RESOURCE_PROFILES
+        entry the browser runs with; sort is a YOUTUBE_SEARCH_SORT key.
+        """
+        if engine == 'browser':
+            yield from self.iter_youtube_videos_browser(search_term, num_videos, profile, sort)
+            return
+
+        yielded = 0
         try:
-            driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
-            
-            # Add stealth settings
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
+            for video_data in self.youtube_http.iter_search(search_term, num_videos, sort):
+                yielded += 1
+                yield video_data
+            return
+        except Exception as e:
+            if engine == 'http':
+                raise
+            if yielded:
+                # Results so far are good; a browser run would start over from the top
+                logger.info("YouTube HTTP engine stopped after %s videos: %s", yielded, e)
+                return
+            logger.warning("YouTube HTTP engine failed, falling back to Chrome: %s", e)
+        permit = admit_fallback('youtube')
+        try:
+            yield from self.iter_youtube_videos_browser(search_term, num_videos, profile, sort)
+        finally:
+            if permit:
+                permit.release()
+
+    def iter_youtube_videos_browser(self, search_term, num_videos=50, profile=RESOURCE_PROFILE, sort='relevance'):
+        """Scrape YouTube search results from the rendered page in Chrome"""
+        with self.browser('youtube', profile) as driver:
             # Navigate to YouTube search
-            encoded_search = quote_plus(search_term)
-            driver.get(f"https://www.youtube.com/results?search_query={encoded_search}")
-            
-            # Wait longer for initial page load
-            time.sleep(8)
-            
-            # Wait for the page to fully load
-            try:
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'ytd-video-renderer'))
-                )
-            except:
-                print("Initial video elements not found, trying alternative approach...")
+            url = f"{YOUTUBE_BASE_URL}/results?search_query={quote_plus(search_term)}"
+            if YOUTUBE_SEARCH_SORT.get(sort):
+                url += f"&sp={quote_plus(YOUTUBE_SEARCH_SORT[sort])}"
+            with phase('youtube', 'navigate'):
+                driver.get(url)
+
+            engine = ScrollEngine(driver, 'ytd-video-renderer', step='viewport', platform='youtube')
+            if not engine.wait_for_items(time_left(15)) and not deadline_expired():
+                logger.warning("Initial video elements not found, trying alternative approach...")
                 # Try scrolling to trigger content loading
-                driver.execute_script("window.scrollTo(0, 500);")
-                time.sleep(3)
-                driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(3)
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scroll_attempts = 15
-            
-            print(f"Starting YouTube scraping for: {search_term}")
+                engine.wait_for_items(3, 500)
+                engine.wait_for_items(3, 0)
+
+            logger.debug("Starting YouTube scraping for: %s", search_term)
+            seen = set()
+
+            def extract():
+                video_elements = self.find_new_video_elements(driver)
+                if not video_elements:
+                    return []
+                logger.debug("Processing %s video elements...", len(video_elements))
+
+                try:
+                    batch = self.extract_youtube_videos_batch(driver, video_elements)
+                except Exception as e:
+                    logger.warning("Selector plan extraction failed, falling back to per-element: %s", e)
+                    batch = [self.extract_youtube_video_data(video_elem) for video_elem in video_elements]
+                    mark_scraped(driver, [elem for elem, data in zip(video_elements, batch) if data['title']])
+
+                videos = []
+                for i, video_data in enumerate(batch):
+                    # Only add if we have meaningful data
+                    if not video_data['title'] or len(video_data['title']) <= 3:
+                        logger.debug("✗ Incomplete data for video %s", i+1)
+                        continue
+                    # Check for duplicates
+                    key = parse_youtube_video_id(video_data['video_url']) or video_data['title']
+                    if key in seen:
+                        logger.debug("✗ Duplicate video skipped: %.30s...", video_data['title'])
+                        continue
+                    seen.add(key)
+                    videos.append(video_data)
+                return videos
+
+            count = 0
+            for video_data in engine.items(extract, num_videos):
+                count += 1
+                logger.debug("✓ Scraped video %s: %.50s... - %s", count, video_data['title'], video_data['channel'])
+                yield video_data
+
+            logger.info("YouTube scraping completed. Total videos: %s", count)
+
+    def iter_youtube_videos_cached(self, search_term, num_videos=50, engine=YOUTUBE_ENGINE, profile=RESOURCE_PROFILE):
+        """iter_youtube_videos through the result cache"""
+        key = ResultCache.key('youtube', search_term, num_videos, engine)
+        cached, fresh = self.cache.lookup(key)
+        if fresh:
+            yield from cached
+            return
+
+        videos = []
+        for video in self.iter_youtube_videos(search_term, num_videos, engine, profile):
+            videos.append(video)
+            yield video
+        if not deadline_hit():
+            self.cache.put(key, videos)
+
+    def scrape_youtube_videos(self, search_term, num_videos=50, use_cache=False, engine=YOUTUBE_ENGINE, profile=RESOURCE_PROFILE):
+        source = self.iter_youtube_videos_cached if use_cache else self.iter_youtube_videos
+        videos, error = collect_items(source(search_term, num_videos, engine, profile))
+        return {"error": error} if error and not videos else videos
+
+    def extract_youtube_comment_data(self, comment_elem, video_url):
+        """Extract one comment thread; returns (comment_id, comment_data)"""
+        # Extract comment text
+        text_elem = comment_elem.find_element(By.CSS_SELECTOR, '#content-text')
+        comment_text = text_elem.text.strip() if text_elem else ''
+        
+        # Extract author
+        author_elem = comment_elem.find_element(By.CSS_SELECTOR, '#author-text')
+        author = author_elem.text.strip() if author_elem else ''
+        
+        # Extract likes
+        like_elem = comment_elem.find_elements(By.CSS_SELECTOR, '#vote-count-middle')
+        # The count is left blank for a comment nobody has liked
+        likes = (like_elem[0].text.strip() if like_elem else '') or '0'
+        
+        # Extract time (its link carries the comment id as &lc=)
+        time_elem = comment_elem.find_elements(By.CSS_SELECTOR, '.published-time-text a')
+        time_posted = time_elem[0].text.strip() if time_elem else ''
+        comment_id = parse_youtube_comment_id(time_elem[0].get_attribute('href')) if time_elem else None
+        
+        return comment_id, {
+            'platform': 'youtube_comment',
+            'comment_id': comment_id or '',
+            'text': comment_text,
+            'author': author,
+            'likes': likes,
+            'time': time_posted,
+            'video_url': video_url
+        }
+
+    def iter_youtube_comments(self, video_url, num_comments=50, sort='top', engine=YOUTUBE_ENGINE, profile=RESOURCE_PROFILE):
+        """Yield comments from a specific YouTube video as they are scraped
+
+        engine works as in iter_youtube_videos; sort ('top' or 'newest') is only
+        honoured by the HTTP engine, the browser reads the default (top) order.
+        """
+        if engine != 'browser':
+            yielded = 0
+            try:
+                for comment_data in self.youtube_http.iter_comments(video_url, num_comments, sort):
+                    yielded += 1
+                    yield comment_data
+                return
+            except Exception as e:
+                if engine == 'http':
+                    raise
+                if yielded:
+                    logger.info("YouTube HTTP comment engine stopped after %s comments: %s", yielded, e)
+                    return
+                logger.warning("YouTube HTTP comment engine failed, falling back to Chrome: %s", e)
+        permit = admit_fallback('youtube') if engine != 'browser' else None
+        try:
+            yield from self.iter_youtube_comments_browser(video_url, num_comments, profile)
+        finally:
+            if permit:
+                permit.release()
+
+    def iter_youtube_comments_browser(self, video_url, num_comments=50, profile=RESOURCE_PROFILE):
+        """Scrape comments by scrolling the rendered watch page in Chrome
+
+        In long-scroll mode a recycled browser scrolls the page again from the top,
+        skipping the comments it already returned.
+        """
+        long_scroll = num_comments >= LONG_SCROLL_ITEMS
+        seen = set()
+        while True:
+            before = len(seen)
+            with self.browser('youtube', profile) as driver:
+                recycle = yield from self.iter_comments_on_page(driver, video_url, num_comments, seen, long_scroll)
+                if recycle:
+                    self.pool.retire(driver)
+            if not recycle or deadline_expired():
+                break
+            if len(seen) == before:
+                logger.warning("Fresh browser ran out of memory before reaching new comments, stopping at %s", before)
+                break
+            logger.info("Restarting YouTube browser after %s comments to free memory", len(seen))
+
+    def iter_comments_on_page(self, driver, video_url, num_comments=50, seen=None, long_scroll=False, navigate=True):
+        """Scroll a watch page in driver's current window and yield its comments
+
+        Every resume assumes the window it was started in is the active one. seen
+        holds the keys of comments already returned (num_comments counts them too);
+        returns True if long-scroll mode stopped to recycle the browser. navigate
+        False means the window is already loading video_url.
+        """
+        seen = set() if seen is None else seen
+        resuming = bool(seen)
+        if navigate:
+            with phase('youtube_comment', 'navigate'):
+                driver.get(video_url)
+
+        # Scroll down to load comments section
+        engine = ScrollEngine(
+            driver, 'ytd-comment-thread-renderer',
+            max_heap_mb=LONG_SCROLL_MAX_HEAP_MB if long_scroll else None, prune=long_scroll,
+            platform='youtube_comment'
+        )
+        if not engine.wait_for_items(time_left(10), 1000) and not deadline_expired():
+            engine.wait_for_items(time_left(engine.max_wait), 'bottom')
+
+        def extract():
+            comment_elements = driver.find_elements(By.CSS_SELECTOR, 'ytd-comment-thread-renderer' + UNSCRAPED)
+            comments = []
+            extracted = []
+            for comment_elem in comment_elements:
+                try:
+                    comment_id, comment_data = self.extract_youtube_comment_data(comment_elem, video_url)
+                except Exception as e:
+                    logger.debug("Error processing individual comment: %s", e)
+                    continue
+                if not comment_data['text']:
+                    continue
+                extracted.append(comment_elem)
+                # Check for duplicates
+                key = comment_id or (comment_data['author'], comment_data['text'])
+                if key not in seen:
+                    seen.add(key)
+                    comments.append(comment_data)
+                elif resuming:
+                    engine.note_progress()
+            mark_scraped(driver, extracted)
+            return comments
+
+        for count, comment_data in enumerate(engine.items(extract, num_comments - len(seen)), len(seen) + 1):
+            logger.debug("Scraped comment %s: %s - %.30s...", count, comment_data['author'], comment_data['text'])
+            yield comment_data
+        return engine.recycle
+
+    def iter_youtube_comments_batch(self, video_urls, num_comments=50, browsers=COMMENT_BATCH_BROWSERS,
+                                    tabs_per_browser=COMMENT_BATCH_TABS_PER_BROWSER, profile=RESOURCE_PROFILE,
+                                    permit=None):
+        """Scrape comments for many videos at once in tabs of a few pooled browsers
+
+        Yields (video_url, comment, error) as comments arrive from any tab; a video
+        that fails yields one error and the others carry on. Each browser thread
+        holds the admission permit, if given, until it exits.
+        """
+        work = queue.Queue()
+        for video_url in video_urls:
+            work.put(video_url)
+        out = queue.Queue()
+        stop = threading.Event()
+        done = object()
+        browsers = max(1, min(browsers, self.pool.max_size, len(video_urls)))
+        trace = current_trace()
+
+        for i in range(browsers):
+            if permit:
+                permit.hold()
+            threading.Thread(
+                target=self._comment_tabs_worker,
+                args=(work, out, done, stop, num_comments, max(1, tabs_per_browser), profile, trace, permit),
+                name=f'comment-tabs-{i}',
+                daemon=True
+            ).start()
 
-            while len(videos) < num_videos and scroll_attempts < max_scroll_attempts:
+        running = browsers
+        try:
+            while running:
+                item = out.get()
+                if item is done:
+                    running -= 1
+                else:
+                    yield item
+            # Whatever no browser got to (every worker failed, or time ran out)
+            reason = "Deadline passed before this video was reached" if deadline_hit() else "No browser available"
+            while True:
                 try:
-                    # Multiple selectors to find video containers
-                    video_selectors = [
-                        'ytd-video-renderer',
-                        'ytd-compact-video-renderer',
-                        'div.ytd-video-renderer',
-                        '[class*="video-renderer"]'
-                    ]
-                    
-                    video_elements = []
-                    for selector in video_selectors:
+                    yield work.get_nowait(), None, reason
+                except queue.Empty:
+                    break
+        finally:
+            stop.set()
+
+    def _comment_tabs_worker(self, work, out, done, stop, num_comments, tabs_per_browser, profile, trace=None,
+                             permit=None):
+        set_trace(trace)
+        # Stopping the batch also stops the page a tab is in the middle of scrolling
+        set_deadline(Deadline(parent=trace.deadline if trace else None, cancel_event=stop))
+        slots = comment_tab_slots()
+        tabs = []
+        try:
+            with self.browser('youtube', profile) as driver:
+                home = driver.current_window_handle
+                while not stop.is_set():
+                    # Open tabs while there is work, a free tab slot and room in this browser
+                    while len(tabs) < tabs_per_browser and not work.empty() and not deadline_expired():
+                        if not slots.acquire(timeout=5 if not tabs else 0):
+                            break
                         try:
-                            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                            if elements:
-                                video_elements = elements
-                                print(f"Found {len(video_elements)} video elements using selector: {selector}")
-                                break
-                        except:
-                            continue
-                    
-                    if not video_elements:
-                        print("No video elements found, scrolling to load more content...")
-                        scroll_attempts += 1
-                        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(4)
-                        continue
-                    
-                    print(f"Processing {len(video_elements)} video elements...")
-                    
-                    for i, video_elem in enumerate(video_elements):
-                        if len(videos) >= num_videos:
+                            video_url = work.get_nowait()
+                        except queue.Empty:
+                            slots.release()
                             break
-                            
+                        driver.switch_to.new_window('tab')
+                        # Start the load without waiting for it, so the tabs' pages load side by side
+                        driver.execute_script("window.location.href = arguments[0];", video_url)
+                        tabs.append({
+                            'handle': driver.current_window_handle,
+                            'video_url': video_url,
+                            'items': self.iter_comments_on_page(driver, video_url, num_comments, navigate=False),
+                        })
+                    if not tabs:
+                        if work.empty() or deadline_hit():
+                            break
+                        continue
+
+                    # One turn per tab, round robin; a tab that fails (a timeout, a stale
+                    # element) only ends its own video
+                    for tab in list(tabs):
+                        driver.switch_to.window(tab['handle'])
+                        finished = False
                         try:
-                            # Scroll element into view
-                            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", video_elem)
-                            time.sleep(0.5)
-                            
-                            video_data = self.extract_youtube_video_data(video_elem)
-                            
-                            # Debug output
-                            print(f"Video {i+1} - Title: '{video_data['title'][:30]}...', Channel: '{video_data['channel']}'")
-                            
-                            # Only add if we have meaningful data
-                            if video_data['title'] and len(video_data['title']) > 3:
-                                # Check for duplicates
-                                video_exists = any(
-                                    existing_video['title'] == video_data['title']
-                                    for existing_video in videos
-                                )
-                                
-                                if not video_exists:
-                                    videos.append(video_data)
-                                    print(f"✓ Scraped video {len(videos)}: {video_data['title'][:50]}... - {video_data['channel']}")
-                                else:
-                                    print(f"✗ Duplicate video skipped: {video_data['title'][:30]}...")
-                            else:
-                                print(f"✗ Incomplete data for video {i+1}")
-                                    
+                            for _ in range(COMMENT_TAB_TURN):
+                                out.put((tab['video_url'], next(tab['items']), None))
+                        except StopIteration:
+                            finished = True
                         except Exception as e:
-                            print(f"Error processing video {i+1}: {str(e)}")
-                            continue
-                    
-                    # Scroll down to load more videos
-                    print("Scrolling to load more videos...")
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(4)
-                    
-                    new_height = driver.execute_script("return document.body.scrollHeight")
-                    if new_height == last_height:
-                        scroll_attempts += 1
-                        print(f"No new content loaded. Scroll attempt {scroll_attempts}/{max_scroll_attempts}")
-                        time.sleep(3)
-                    else:
-                        scroll_attempts = 0
-                        print(f"New content loaded. Total videos so far: {len(videos)}")
-                        
-                    last_height = new_height
-                    
-                except Exception as e:
-                    print(f"Error in YouTube scroll iteration: {str(e)}")
-                    scroll_attempts += 1
-                    time.sleep(3)
-
-            print(f"YouTube scraping completed. Total videos: {len(videos)}")
-            driver.quit()
-            return videos
-            
+                            out.put((tab['video_url'], None, str(e)))
+                            finished = True
+                        if finished:
+                            tabs.remove(tab)
+                            tab['items'].close()
+                            slots.release()
+                            driver.close()
+                            driver.switch_to.window(home)
         except Exception as e:
-            print(f"Critical YouTube scraping error: {str(e)}")
-            if 'driver' in locals():
-                driver.quit()
-            return {"error": str(e)}
+            logger.error("Comment tab browser failed: %s", e)
+            for tab in tabs:
+                out.put((tab['video_url'], None, str(e)))
+        finally:
+            for tab in tabs:
+                tab['items'].close()
+                slots.release()
+            out.put(done)
+            set_deadline(None)
+            set_trace(None)
+            if permit:
+                permit.drop()
 
-    def scrape_youtube_comments(self, video_url, num_comments=50):
+    def scrape_youtube_comments(self, video_url, num_comments=50, sort='top', engine=YOUTUBE_ENGINE, profile=RESOURCE_PROFILE):
         """Scrape comments from a specific YouTube video"""
-        comments = []
+        comments, error = collect_items(self.iter_youtube_comments(video_url, num_comments, sort, engine, profile))
+        return {"error": error} if error and not comments else comments
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the job queue is at capacity"""
+
+
+class Job:
+    def __init__(self, job_type, params, runner):
+        self.id = uuid.uuid4().hex
+        self.type = job_type
+        self.params = params
+        self.runner = runner
+        self.status = 'queued'
+        self.results = []
+        self.errors = {}
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def add_result(self, item):
+        with self.lock:
+            self.results.append(item)
+
+    def add_error(self, name, message):
+        with self.lock:
+            self.errors[name] = message
+
+    def to_dict(self, include_results=True):
+        with self.lock:
+            job = {
+                'job_id': self.id,
+                'type': self.type,
+                'status': self.status,
+                'progress': len(self.results),
+                'params': self.params,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+            }
+            if self.errors:
+                job['errors'] = dict(self.errors)
+            if include_results:
+                job['results'] = list(self.results)
+        return job
+
+
+class JobManager:
+    """Bounded queue of scrape jobs executed by a fixed set of worker threads"""
+
+    def __init__(self, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE, retention=JOB_RETENTION_SECONDS):
+        self.retention = retention
+        self.jobs = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f'job-worker-{i}', daemon=True).start()
+
+    def submit(self, job_type, params, runner):
+        job = Job(job_type, params, runner)
+        self._prune()
         try:
-            driver = webdriver.Chrome(service=self.service, options=self.chrome_options)
-            
-            # Add stealth settings
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            driver.get(video_url)
-            time.sleep(5)
-            
-            # Scroll down to load comments section
-            driver.execute_script("window.scrollTo(0, 1000);")
-            time.sleep(3)
-            
-            last_height = driver.execute_script("return document.body.scrollHeight")
-            scroll_attempts = 0
-            max_scroll_attempts = 15
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise JobQueueFull(f"Job queue is full ({self._queue.maxsize} waiting)")
+        with self._lock:
+            self.jobs[job.id] = job
+        return job
 
-            while len(comments) < num_comments and scroll_attempts < max_scroll_attempts:
-                try:
-                    # Wait for comments to load
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'ytd-comment-thread-renderer'))
-                    )
-                    
-                    comment_elements = driver.find_elements(By.CSS_SELECTOR, 'ytd-comment-thread-renderer')
-                    
-                    for comment_elem in comment_elements:
-                        if len(comments) >= num_comments:
-                            break
-                            
-                        try:
-                            # Extract comment text
-                            text_elem = comment_elem.find_element(By.CSS_SELECTOR, '#content-text')
-                            comment_text = text_elem.text.strip() if text_elem else ''
-                            
-                            # Extract author
-                            author_elem = comment_elem.find_element(By.CSS_SELECTOR, '#author-text')
-                            author = author_elem.text.strip() if author_elem else ''
-                            
-                            # Extract likes
-                            like_elem = comment_elem.find_elements(By.CSS_SELECTOR, '#vote-count-middle')
-                            likes = like_elem[0].text.strip() if like_elem else '0'
-                            
-                            # Extract time
-                            time_elem = comment_elem.find_elements(By.CSS_SELECTOR, '.published-time-text a')
-                            time_posted = time_elem[0].text.strip() if time_elem else ''
-                            
-                            comment_data = {
-                                'platform': 'youtube_comment',
-                                'text': comment_text,
-                                'author': author,
-                                'likes': likes,
-                                'time': time_posted,
-                                'video_url': video_url
-                            }
-                            
-                            # Check for duplicates
-                            comment_exists = any(
-                                existing_comment['text'] == comment_data['text'] and 
-                                existing_comment['author'] == comment_data['author']
-                                for existing_comment in comments
-                            )
-                            
-                            if not comment_exists and comment_data['text']:
-                                comments.append(comment_data)
-                                print(f"Scraped comment {len(comments)}: {comment_data['author']} - {comment_data['text'][:30]}...")
-                                
-                        except Exception as e:
-                            print(f"Error processing individual comment: {str(e)}")
-                            continue
-                    
-                    # Scroll down to load more comments
-                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(3)
-                    
-                    new_height = driver.execute_script("return document.body.scrollHeight")
-                    if new_height == last_height:
-                        scroll_attempts += 1
-                        time.sleep(2)
-                    else:
-                        scroll_attempts = 0
-                        
-                    last_height = new_height
-                    
-                except Exception as e:
-                    print(f"Error in YouTube comments scroll iteration: {str(e)}")
-                    scroll_attempts += 1
-                    time.sleep(2)
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
 
-            driver.quit()
-            return comments
-            
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel_event.set()
+        with job.lock:
+            if job.status == 'queued':
+                job.status = 'cancelled'
+                job.finished = time.time()
+        return job
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job):
+        with job.lock:
+            if job.status != 'queued':
+                return
+            job.status = 'running'
+            job.started = time.time()
+
+        # Scroll loops and login waits watch the trace's deadline, so cancelling stops them mid-scrape
+        trace = Trace(Deadline(cancel_event=job.cancel_event))
+        set_trace(trace)
+        items = None
+        status = 'completed'
+        try:
+            # Runners return None when the job was cancelled before it was admitted
+            items = job.runner(job)
+            for item in items or ():
+                job.add_result(item)
+                if job.cancel_event.is_set():
+                    break
+            # Also covers a job cancelled while it waited for admission
+            if job.cancel_event.is_set():
+                status = 'cancelled'
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e)
+            job.add_error(job.type, str(e))
+            status = 'cancelled' if job.cancel_event.is_set() else 'failed'
+        finally:
+            # Closing the generator hands its browser back to the pool
+            if items is not None:
+                items.close()
+
+        set_trace(None)
+        logger.info("Job %s (%s) %s: %s", job.id, job.type, status, json.dumps(trace.summary()))
+        with job.lock:
+            job.status = status
+            job.finished = time.time()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and job.finished < cutoff]:
+                del self.jobs[job_id]
+
+
+class Overloaded(Exception):
+    """Raised when a scrape cannot be admitted; retry_after is a wait estimate in seconds"""
+
+    def __init__(self, lane, retry_after):
+        super().__init__(f"Too many {lane} scrapes in progress, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class AdmissionLane:
+    """Counting semaphore with a bounded wait queue served in priority order"""
+
+    def __init__(self, name, capacity, queue_size=ADMISSION_QUEUE_SIZE):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.queue_size = queue_size
+        self.in_use = 0
+        self.rejected = 0
+        # Moving average of how long a scrape holds its slot, for Retry-After
+        self.avg_hold = 10.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def acquire(self, priority='interactive', timeout=ADMISSION_MAX_WAIT, count=1, bounded=True, cancel=None):
+        """Take count slots (at most the capacity), returning how many were taken
+
+        timeout None waits indefinitely; bounded=False skips the queue limit. Once
+        the cancel event is set the wait ends and None is returned.
+        """
+        count = min(count, self.capacity)
+        with self._cond:
+            if not self._waiters and self.in_use + count <= self.capacity:
+                self.in_use += count
+                return count
+            if bounded and len(self._waiters) >= self.queue_size:
+                self.rejected += 1
+                raise Overloaded(self.name, self.retry_after())
+            ticket = (PRIORITIES.get(priority, 0), next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while self._waiters[0] != ticket or self.in_use + count > self.capacity:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected += 1
+                        raise Overloaded(self.name, self.retry_after())
+                    if cancel is not None:
+                        if cancel.is_set():
+                            return None
+                        remaining = 0.5 if remaining is None else min(remaining, 0.5)
+                    self._cond.wait(remaining)
+                heapq.heappop(self._waiters)
+                self.in_use += count
+                return count
+            finally:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def release(self, count, held_seconds):
+        with self._cond:
+            self.in_use -= count
+            self.avg_hold = 0.8 * self.avg_hold + 0.2 * held_seconds
+            self._cond.notify_all()
+
+    def retry_after(self):
+        return max(1, math.ceil(self.avg_hold * (len(self._waiters) + 1) / self.capacity))
+
+    def stats(self):
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'in_use': self.in_use,
+                'queued': len(self._waiters),
+                'rejected': self.rejected,
+                'avg_hold_seconds': round(self.avg_hold, 1),
+            }
+
+
+class Permit:
+    """Slots held on one or more lanes; release() is safe to call more than once
+
+    Worker threads still driving browsers for the permit hold() it and drop() it
+    when they exit; the slots go back once it is released and no thread holds it.
+    """
+
+    def __init__(self):
+        self.held = []
+        self.started = time.monotonic()
+        self.holders = 0
+        self.released = False
+        self.lock = threading.Lock()
+
+    def granted(self, lane_name):
+        return sum(count for lane, count in self.held if lane.name == lane_name)
+
+    def hold(self):
+        with self.lock:
+            self.holders += 1
+
+    def drop(self):
+        with self.lock:
+            self.holders -= 1
+            free = self.released and not self.holders
+        if free:
+            self._free()
+
+    def release(self):
+        with self.lock:
+            self.released = True
+            free = not self.holders
+        if free:
+            self._free()
+
+    def _free(self):
+        held_seconds = time.monotonic() - self.started
+        with self.lock:
+            held, self.held = self.held, []
+        for lane, count in reversed(held):
+            lane.release(count, held_seconds)
+
+
+class AdmissionController:
+    def __init__(self, limits=ADMISSION_LIMITS):
+        self.lanes = {name: AdmissionLane(name, capacity) for name, capacity in limits.items()}
+
+    def admit(self, lane_names, priority='interactive', timeout=ADMISSION_MAX_WAIT, counts=None, bounded=True,
+              cancel=None):
+        """Acquire every named lane (always in ADMISSION_LIMITS order, so waiters cannot deadlock)
+
+        timeout bounds the wait for all of them together. Returns None, holding
+        nothing, if the cancel event is set while waiting.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        permit = Permit()
+        try:
+            for name in [name for name in self.lanes if name in lane_names]:
+                lane = self.lanes[name]
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                count = lane.acquire(priority, remaining, (counts or {}).get(name, 1), bounded, cancel)
+                if count is None:
+                    permit.release()
+                    return None
+                permit.held.append((lane, count))
+        except Exception:
+            permit.release()
+            raise
+        permit.started = time.monotonic()
+        return permit
+
+    def stats(self):
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+ADMISSION = AdmissionController()
+
+def scrape_lanes(platform, engine=YOUTUBE_ENGINE):
+    """Admission lanes a scrape of platform needs up front
+
+    None for YouTube unless engine is 'browser'; 'auto' takes its lanes in
+    admit_fallback, only if it ends up driving Chrome.
+    """
+    if platform == 'twitter':
+        return ['twitter_account', 'twitter', 'browser']
+    return ['youtube', 'browser'] if engine == 'browser' else []
+
+def admit_fallback(platform):
+    """Admit the browser lanes of an engine=auto scrape that is falling back to Chrome
+
+    Uses the admitter of the current request or job; None outside of one.
+    """
+    trace = current_trace()
+    if trace is None or trace.admitter is None:
+        return None
+    permit = trace.admitter(scrape_lanes(platform, 'browser'))
+    if permit is None:
+        raise ScraperError("Cancelled while waiting for a browser")
+    return permit
+
+
+class AdmittedItems:
+    """Iterator over items that releases its permit once they are exhausted, fail or are closed"""
+
+    def __init__(self, permit, items):
+        self.permit = permit
+        self.items = iter(items)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self.items)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            if hasattr(self.items, 'close'):
+                self.items.close()
+        finally:
+            self.permit.release()
+
+
+class Watch:
+    """A search term polled on an interval, with the high-water mark of what it has already seen"""
+
+    FIELDS = ('id', 'platform', 'search_term', 'interval', 'max_items', 'webhook', 'extraction',
+              'profile', 'engine', 'created', 'last_poll', 'polls', 'last_new', 'last_error',
+              'newest_time', 'known')
+
+    def __init__(self, **fields):
+        self.id = uuid.uuid4().hex
+        self.created = time.time()
+        self.max_items = WATCH_MAX_ITEMS
+        self.webhook = ''
+        self.extraction = TWEET_EXTRACTION
+        self.profile = RESOURCE_PROFILE
+        self.engine = YOUTUBE_ENGINE
+        self.last_poll = None
+        self.polls = 0
+        self.last_new = 0
+        self.last_error = None
+        # Newest tweet time seen (ISO, sorts as text) and the keys of the latest items, newest first
+        self.newest_time = None
+        self.known = []
+        for name, value in fields.items():
+            if name in self.FIELDS:
+                setattr(self, name, value)
+        self.known_set = set(self.known)
+        self.next_run = time.time()
+        self.running = False
+        self.job = None
+
+    def is_known(self, item):
+        """True once a poll reaches items from earlier polls (results come newest first)"""
+        if stored_item_id(item) in self.known_set:
+            return True
+        posted = item.get('time') if self.platform == 'twitter' else None
+        return bool(posted and self.newest_time and posted < self.newest_time)
+
+    def advance(self, new_items):
+        """Move the high-water mark past new_items (newest first)"""
+        self.known = ([stored_item_id(item) for item in new_items] + self.known)[:WATCH_KNOWN_KEYS]
+        self.known_set = set(self.known)
+        if self.platform == 'twitter':
+            times = [item['time'] for item in new_items if item.get('time')]
+            self.newest_time = max(times + ([self.newest_time] if self.newest_time else []), default=None)
+
+    def to_dict(self, include_state=False):
+        watch = {name: getattr(self, name) for name in self.FIELDS if name != 'known'}
+        watch['next_run'] = self.next_run
+        if include_state:
+            watch['known'] = self.known
+        else:
+            watch['known_items'] = len(self.known)
+        return watch
+
+
+class Watchlist:
+    """Watches persisted to disk, and the scheduler thread that polls them through the job queue"""
+
+    def __init__(self, path=WATCHLIST_FILE, min_gap=WATCH_MIN_GAP):
+        self.path = path
+        self.min_gap = min_gap
+        self.watches = {}
+        self.events = deque(maxlen=WATCH_QUEUE_SIZE)
+        self.http = urllib3.PoolManager(timeout=urllib3.Timeout(total=HTTP_TIMEOUT), retries=urllib3.Retry(total=2, backoff_factor=0.5))
+        self._last_start = 0.0
+        self._cond = threading.Condition()
+        self._load()
+        threading.Thread(target=self._schedule, name='watchlist', daemon=True).start()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
         except Exception as e:
-            if 'driver' in locals():
-                driver.quit()
-            return {"error": str(e)}
+            logger.warning("Could not read watchlist file: %s", e)
+            return
+        for fields in saved:
+            watch = Watch(**fields)
+            self.watches[watch.id] = watch
+
+    def _save(self):
+        """Write the watches and their high-water marks; call with the lock held"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump([watch.to_dict(include_state=True) for watch in self.watches.values()], f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, watch):
+        with self._cond:
+            self.watches[watch.id] = watch
+            self._save()
+            self._cond.notify()
+        return watch
+
+    def get(self, watch_id):
+        with self._cond:
+            return self.watches.get(watch_id)
+
+    def list(self):
+        with self._cond:
+            return list(self.watches.values())
+
+    def remove(self, watch_id):
+        with self._cond:
+            watch = self.watches.pop(watch_id, None)
+            if watch:
+                self._save()
+            return watch
+
+    def drain_events(self, limit):
+        with self._cond:
+            return [self.events.popleft() for _ in range(min(limit, len(self.events)))]
+
+    def _schedule(self):
+        """Start the most overdue idle watch, never two polls within min_gap of each other"""
+        while True:
+            with self._cond:
+                now = time.time()
+                for watch in self.watches.values():
+                    # A poll cancelled while still queued never runs, so never finishes
+                    if watch.running and watch.job and watch.job.status == 'cancelled' and not watch.job.started:
+                        watch.running = False
+                        watch.next_run = now + watch.interval
+                idle = [watch for watch in self.watches.values() if not watch.running]
+                watch = min(idle, key=lambda w: w.next_run, default=None)
+                start_at = max(watch.next_run, self._last_start + self.min_gap) if watch else now + 60
+                if start_at > now:
+                    self._cond.wait(min(start_at - now, 60))
+                    continue
+                watch.running = True
+                self._last_start = now
+            self._submit(watch)
+
+    def _submit(self, watch):
+        params = {'watch_id': watch.id, 'search_term': watch.search_term, 'priority': 'bulk'}
+        try:
+            watch.job = get_job_manager().submit('watch', params, run_watch_poll)
+        except JobQueueFull as e:
+            logger.warning("Watch %s poll skipped: %s", watch.id, e)
+            with self._cond:
+                watch.running = False
+                watch.next_run = time.time() + watch.interval / 4
+
+    def source(self, watch):
+        """Generator of the watch's newest items, newest first"""
+        scraper = get_scraper()
+        if watch.platform == 'twitter':
+            return scraper.iter_tweets(watch.search_term, watch.max_items, watch.extraction, profile=watch.profile)
+        return scraper.iter_youtube_videos(watch.search_term, watch.max_items, watch.engine, watch.profile,
+                                           sort='upload_date')
+
+    def finish(self, watch, new_items, error=None):
+        """Record a poll, advance the high-water mark and deliver what was new"""
+        with self._cond:
+            now = time.time()
+            watch.running = False
+            watch.polls += 1
+            watch.last_poll = now
+            watch.last_new = len(new_items)
+            watch.last_error = error
+            # +-10% jitter keeps watches with equal intervals from lining up
+            watch.next_run = now + watch.interval * random.uniform(0.9, 1.1)
+            watch.advance(new_items)
+            if watch.id in self.watches:
+                self._save()
+            self._cond.notify()
+        if new_items:
+            self.deliver(watch, new_items)
+
+    def deliver(self, watch, new_items):
+        event = {
+            'watch_id': watch.id,
+            'platform': watch.platform,
+            'search_term': watch.search_term,
+            'polled_at': watch.last_poll,
+            # A full poll may have stopped before reaching the previous high-water mark
+            'gap_possible': watch.polls > 1 and len(new_items) >= watch.max_items,
+            'items': new_items,
+        }
+        webhook = watch.webhook or WATCH_WEBHOOK_URL
+        if webhook:
+            try:
+                response = self.http.request('POST', webhook, body=json.dumps(event), headers={'Content-Type': 'application/json'})
+                if response.status < 300:
+                    return
+                logger.warning("Watch %s webhook returned HTTP %s, queueing instead", watch.id, response.status)
+            except Exception as e:
+                logger.warning("Watch %s webhook failed, queueing instead: %s", watch.id, e)
+        with self._cond:
+            self.events.append(event)
+
 
 # Replace with real credentials for Twitter
 TWITTER_USERNAME = "@DineshRaut55503"
 TWITTER_PASSWORD = "Rdhobe@140599"
 
+_scraper = None
+_scraper_lock = threading.Lock()
+
+def get_scraper():
+    """Return the process-wide scraper (and its driver pool), creating it on first use"""
+    global _scraper
+    with _scraper_lock:
+        if _scraper is None:
+            _scraper = SocialMediaScraper(TWITTER_USERNAME, TWITTER_PASSWORD)
+            atexit.register(_scraper.pool.close)
+        return _scraper
+
+# Readiness: set once any browser has launched; error holds the last startup failure
+_readiness = {'ready': False, 'since': None, 'error': None}
+
+def mark_ready():
+    if not _readiness['ready']:
+        _readiness.update(ready=True, since=time.time(), error=None)
+
+def prewarm():
+    """Resolve Chrome and start one browser, leaving it idle in the pool"""
+    started = time.perf_counter()
+    try:
+        scraper = get_scraper()
+        with scraper.browser(PREWARM_PLATFORM):
+            pass
+        logger.info("Prewarmed a %s browser in %.1fs", PREWARM_PLATFORM, time.perf_counter() - started)
+    except Exception as e:
+        _readiness['error'] = str(e)
+        logger.error("Prewarm failed: %s", e)
+
+def prewarm_in_background():
+    threading.Thread(target=prewarm, name='prewarm', daemon=True).start()
+
+def use_result_cache(data):
+    """Cached results are used unless the request sends cache: false"""
+    return str(data.get('cache', True)).lower() not in ('false', '0', 'no')
+
+def use_typed_metrics(data):
+    return str(data.get('typed', TYPED_METRICS)).lower() in ('true', '1', 'yes')
+
+def shape_items(items, data):
+    """Apply the typed/format options of a request to a list of scraped items
+
+    Anything that is not a list (an {"error": ...} result) is returned unchanged.
+    """
+    if not isinstance(items, list):
+        return items
+    if use_typed_metrics(data):
+        now = time.time()
+        items = [normalize_item(item, now) for item in items]
+    if str(data.get('format', '')).lower() == 'columnar':
+        return to_columns(items)
+    return items
+
+def resource_profile(data):
+    """The resource profile a request asked for (RESOURCE_PROFILE by default), or None if unknown"""
+    profile = data.get('profile') or RESOURCE_PROFILE
+    return profile if profile in RESOURCE_PROFILES else None
+
+def profile_error():
+    return jsonify({"error": f"profile must be one of: {', '.join(RESOURCE_PROFILES)}"})
+
+class InvalidParameter(Exception):
+    """Raised for a request parameter that cannot be parsed; answered with a 400"""
+
+
+def number_param(data, name, default=None):
+    """data[name] as a float (default if absent), raising InvalidParameter if it is not a number"""
+    value = data.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise InvalidParameter(f"{name} must be a number")
+
+def request_deadline(data):
+    """Start the request's Deadline from deadline_ms (or budget, in seconds); None if neither is given"""
+    if data.get('deadline_ms') is not None:
+        seconds = number_param(data, 'deadline_ms') / 1000
+    elif data.get('budget') is not None:
+        seconds = number_param(data, 'budget')
+    else:
+        return None
+    deadline = Deadline(max(0.0, seconds))
+    g.trace.deadline = deadline
+    return deadline
+
+def scrape_response(items, error, deadline, data):
+    """Body for one scrape's results
+
+    Without a deadline this is the items (or {"error": ...} if nothing was
+    scraped), as before. With a deadline, or when an error cut the scrape short
+    after some items, it is a {results, truncated, reason} envelope.
+    """
+    if not deadline and not (error and items):
+        return {"error": error} if error else shape_items(items, data)
+    reason = f"error: {error}" if error else ('deadline' if deadline.hit else None)
+    return {'results': shape_items(items, data), 'truncated': reason is not None, 'reason': reason}
+
+def request_priority(data, default='interactive'):
+    priority = str(data.get('priority') or default).lower()
+    return priority if priority in PRIORITIES else default
+
+def admit_request(lane_names, data, counts=None):
+    """Admit the current request's scrape; the slots are released when the request (or its stream) ends"""
+    priority = request_priority(data)
+    permit = ADMISSION.admit(lane_names, priority, time_left(ADMISSION_MAX_WAIT), counts=counts)
+    g.permit = permit
+    g.trace.admitter = lambda lanes: ADMISSION.admit(lanes, priority, time_left(ADMISSION_MAX_WAIT))
+    return permit
+
+@app.errorhandler(Overloaded)
+def overloaded(e):
+    ADMISSION_REJECTED.inc(lane=e.lane)
+    response = jsonify({"error": str(e)})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.errorhandler(InvalidParameter)
+def invalid_parameter(e):
+    return jsonify({"error": str(e)}), 400
+
+def stream_format(data):
+    """'ndjson' or 'sse' when the caller asked for a streamed response, else None"""
+    fmt = str(data.get('stream') or request.args.get('stream') or '').lower()
+    if not fmt:
+        accept = request.headers.get('Accept', '')
+        if 'text/event-stream' in accept:
+            fmt = 'sse'
+        elif 'application/x-ndjson' in accept:
+            fmt = 'ndjson'
+    return fmt if fmt in ('ndjson', 'sse') else None
+
+def iter_concurrently(sources, permit=None):
+    """Run (name, generator factory, timeout) sources in parallel threads
+
+    Yields (name, item, error) tuples as items arrive from any source. A source
+    that raises or runs past its timeout (None for no limit) yields one error and
+    stops; the others keep going. Each source thread runs under its own Deadline,
+    so a timed-out or abandoned source stops at its next scroll step rather than
+    after its next item. Each thread holds the admission permit until it exits.
+    """
+    done = object()
+    out = queue.Queue()
+    timeouts = {name: timeout for name, _, timeout in sources}
+    deadlines = {name: time.monotonic() + timeout if timeout else None for name, timeout in timeouts.items()}
+    stops = {name: threading.Event() for name in timeouts}
+    trace = current_trace()
+    parent = current_deadline()
+
+    def run(name, source):
+        set_trace(trace)
+        deadline = Deadline(timeouts[name] or None, parent, stops[name])
+        set_deadline(deadline)
+        items = None
+        try:
+            items = source()
+            for item in items:
+                if stops[name].is_set():
+                    break
+                out.put((name, item, None))
+                if deadline.expired():
+                    break
+        except Exception as e:
+            out.put((name, None, str(e)))
+        finally:
+            # Closing the generator hands its browser back to the pool
+            if items is not None:
+                items.close()
+            out.put((name, done, None))
+            set_deadline(None)
+            set_trace(None)
+            if permit:
+                permit.drop()
+
+    for name, source, _ in sources:
+        if permit:
+            permit.hold()
+        threading.Thread(target=run, args=(name, source), name=f'fan-out-{name}', daemon=True).start()
+
+    pending = set(deadlines)
+    try:
+        while pending:
+            now = time.monotonic()
+            for name in [name for name in pending if deadlines[name] and deadlines[name] <= now]:
+                pending.discard(name)
+                stops[name].set()
+                yield name, None, f"{name} timed out after {timeouts[name]:g}s"
+            limits = [deadlines[name] - now for name in pending if deadlines[name]]
+            if not pending:
+                break
+            try:
+                name, item, error = out.get(timeout=max(0.05, min(limits)) if limits else None)
+            except queue.Empty:
+                continue
+            if name not in pending:
+                continue
+            if item is done:
+                pending.discard(name)
+            else:
+                yield name, item, error
+                if error:
+                    pending.discard(name)
+    finally:
+        for stop in stops.values():
+            stop.set()
+
+def cached_response(name, items, data, deadline):
+    """Answer a scrape route from a fresh cache entry, streamed if the request asked for it"""
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(((name, item, None) for item in items), fmt, use_typed_metrics(data), deadline)
+    return jsonify(scrape_response(items, None, deadline, data))
+
+def stream_items(results, fmt, typed=False, deadline=None):
+    """Stream (name, item, error) results as NDJSON lines or SSE events
+
+    Errors become {'error', 'source'} records (an 'error' event for SSE). A
+    deadline that cut the scrape short ends the stream with a
+    {'truncated': true, 'reason': 'deadline'} record ('truncated' event).
+    """
+    def encode(payload, event=None):
+        body = json.dumps(payload, ensure_ascii=False)
+        if fmt == 'sse':
+            return f"event: {event}\ndata: {body}\n\n" if event else f"data: {body}\n\n"
+        return body + "\n"
+
+    def generate():
+        for name, item, error in results:
+            if error:
+                yield encode({'error': error, 'source': name}, event='error')
+            else:
+                yield encode(normalize_item(item) if typed else item)
+        if deadline and deadline.hit:
+            yield encode({'truncated': True, 'reason': 'deadline'}, event='truncated')
+        if fmt == 'sse':
+            yield encode({}, event='end')
+
+    mimetype = 'text/event-stream' if fmt == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.before_request
+def start_trace():
+    g.trace = Trace()
+    g.started = time.perf_counter()
+    set_trace(g.trace)
+
+@app.after_request
+def add_server_timing(response):
+    """Count the request and, for buffered responses, expose its trace as Server-Timing"""
+    HTTP_REQUESTS.inc(endpoint=request.endpoint or 'unknown', status=response.status_code)
+    trace = g.get('trace')
+    if trace and not response.is_streamed:
+        summary = trace.summary()
+        timings = [f"{name};dur={phase_summary['seconds'] * 1000:.1f}" for name, phase_summary in summary['phases'].items()]
+        if summary['webdriver_commands']:
+            timings.append(f'webdriver;desc="{summary["webdriver_commands"]} commands"')
+        if timings:
+            response.headers['Server-Timing'] = ', '.join(timings)
+    return response
+
+@app.teardown_request
+def finish_trace(exc):
+    """Runs after streamed bodies finish too, so the duration, trace and admission slots cover the whole scrape"""
+    permit = g.pop('permit', None)
+    if permit:
+        permit.release()
+    trace = g.pop('trace', None)
+    set_trace(None)
+    if trace is None or request.endpoint == 'metrics':
+        return
+    HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.started, endpoint=request.endpoint or 'unknown')
+    summary = trace.summary()
+    if summary['phases']:
+        logger.info("Trace %s %s: %s", request.method, request.path, json.dumps(summary))
+
+@app.after_request
+def compress_response(response):
+    """brotli/gzip-compress larger buffered responses the client accepts"""
+    if response.is_streamed or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    accepted = set()
+    for token in request.headers.get('Accept-Encoding', '').lower().split(','):
+        name, _, params = token.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            accepted.add(name.strip())
+    encoding = 'br' if brotli and 'br' in accepted else 'gzip' if 'gzip' in accepted else None
+    if not encoding:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(brotli.compress(body) if encoding == 'br' else gzip.compress(body, compresslevel=6))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/fetch-tweets', methods=['POST'])
 def fetch_tweets():
     data = request.get_json()
     search_term = data.get('search_term', 'unknown')
     num_tweets = int(data.get('num_tweets', 10))
+    extraction = data.get('extraction', TWEET_EXTRACTION)
+    use_cache = use_result_cache(data)
+    profile = resource_profile(data)
+    if not profile:
+        return profile_error()
     
-    scraper = SocialMediaScraper(TWITTER_USERNAME, TWITTER_PASSWORD)
-    tweets = scraper.scrape_tweets(search_term, num_tweets)
+    scraper = get_scraper()
+    deadline = request_deadline(data)
+    # A fresh cache hit needs no browser, so it is answered without queuing for admission
+    cached = scraper.cache.fresh(ResultCache.key('twitter', search_term, num_tweets, extraction)) if use_cache else None
+    if cached is not None:
+        return cached_response('tweets', cached, data, deadline)
+    permit = admit_request(scrape_lanes('twitter'), data)
+    source = scraper.iter_tweets_cached if use_cache else scraper.iter_tweets
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(iter_concurrently([
+            ('tweets', lambda: source(search_term, num_tweets, extraction, profile=profile), None)
+        ], permit), fmt, use_typed_metrics(data), deadline)
+    tweets, error = collect_items(source(search_term, num_tweets, extraction, profile=profile))
     
-    return jsonify(tweets)
+    return jsonify(scrape_response(tweets, error, deadline, data))
 
 @app.route('/fetch-youtube-videos', methods=['POST'])
 def fetch_youtube_videos():
     data = request.get_json()
     search_term = data.get('search_term', 'unknown')
     num_videos = int(data.get('num_videos', 10))
+    engine = data.get('engine', YOUTUBE_ENGINE)
     
-    scraper = SocialMediaScraper()
-    videos = scraper.scrape_youtube_videos(search_term, num_videos)
+    use_cache = use_result_cache(data)
+    profile = resource_profile(data)
+    if not profile:
+        return profile_error()
     
-    return jsonify(videos)
+    scraper = get_scraper()
+    deadline = request_deadline(data)
+    cached = scraper.cache.fresh(ResultCache.key('youtube', search_term, num_videos, engine)) if use_cache else None
+    if cached is not None:
+        return cached_response('youtube_videos', cached, data, deadline)
+    permit = admit_request(scrape_lanes('youtube', engine), data)
+    source = scraper.iter_youtube_videos_cached if use_cache else scraper.iter_youtube_videos
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(iter_concurrently([
+            ('youtube_videos', lambda: source(search_term, num_videos, engine, profile), None)
+        ], permit), fmt, use_typed_metrics(data), deadline)
+    videos, error = collect_items(source(search_term, num_videos, engine, profile))
+    
+    return jsonify(scrape_response(videos, error, deadline, data))
 
 @app.route('/fetch-youtube-comments', methods=['POST'])
 def fetch_youtube_comments():
     data = request.get_json()
     video_url = data.get('video_url', '')
     num_comments = int(data.get('num_comments', 50))
+    sort = data.get('sort', 'top')
+    engine = data.get('engine', YOUTUBE_ENGINE)
     
     if not video_url:
         return jsonify({"error": "video_url is required"})
+    profile = resource_profile(data)
+    if not profile:
+        return profile_error()
+    
+    scraper = get_scraper()
+    deadline = request_deadline(data)
+    permit = admit_request(scrape_lanes('youtube', engine), data)
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(iter_concurrently([
+            ('youtube_comments', lambda: scraper.iter_youtube_comments(video_url, num_comments, sort, engine, profile), None)
+        ], permit), fmt, use_typed_metrics(data), deadline)
+    comments, error = collect_items(scraper.iter_youtube_comments(video_url, num_comments, sort, engine, profile))
+    
+    return jsonify(scrape_response(comments, error, deadline, data))
+
+@app.route('/fetch-youtube-comments-batch', methods=['POST'])
+def fetch_youtube_comments_batch():
+    """Fetch comments for many videos at once, grouped by video_url"""
+    data = request.get_json()
+    video_urls = data.get('video_urls') or []
+    if not isinstance(video_urls, list) or not video_urls:
+        return jsonify({"error": "video_urls must be a non-empty list"})
+    video_urls = list(dict.fromkeys(video_urls))
+    num_comments = min(int(data.get('num_comments', 50)), COMMENT_BATCH_MAX_PER_VIDEO)
+    browsers = int(data.get('max_browsers', COMMENT_BATCH_BROWSERS))
+    tabs_per_browser = int(data.get('tabs_per_browser', COMMENT_BATCH_TABS_PER_BROWSER))
+    profile = resource_profile(data)
+    if not profile:
+        return profile_error()
+    
+    scraper = get_scraper()
+    deadline = request_deadline(data)
+    # One youtube slot per browser the batch drives (at most the lane's capacity)
+    browsers = max(1, min(browsers, len(video_urls)))
+    permit = admit_request(scrape_lanes('youtube', 'browser'), data, counts={'youtube': browsers, 'browser': browsers})
+    browsers = min(permit.granted('youtube'), permit.granted('browser'))
+    results = scraper.iter_youtube_comments_batch(video_urls, num_comments, browsers, tabs_per_browser, profile,
+                                                  permit)
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(results, fmt, use_typed_metrics(data), deadline)
     
-    scraper = SocialMediaScraper()
-    comments = scraper.scrape_youtube_comments(video_url, num_comments)
+    comments = {video_url: [] for video_url in video_urls}
+    errors = {}
+    for video_url, comment, error in results:
+        if error:
+            errors[video_url] = error
+        elif video_url not in errors:
+            comments[video_url].append(comment)
     
-    return jsonify(comments)
+    return jsonify({
+        video_url: scrape_response(items, errors.get(video_url), deadline, data)
+        for video_url, items in comments.items()
+    })
+
+# Platforms /fetch-all fans out to: result key -> generator factory(scraper, search_term, request data)
+FETCH_ALL_PLATFORMS = {
+    'tweets': lambda scraper, search_term, data: (
+        scraper.iter_tweets_cached if use_result_cache(data) else scraper.iter_tweets
+    )(search_term, int(data.get('num_tweets', 10)), profile=resource_profile(data)),
+    'youtube_videos': lambda scraper, search_term, data: (
+        scraper.iter_youtube_videos_cached if use_result_cache(data) else scraper.iter_youtube_videos
+    )(search_term, int(data.get('num_videos', 10)), data.get('engine', YOUTUBE_ENGINE), resource_profile(data)),
+}
+
+# Result cache key and admission lanes of each /fetch-all platform, matching the factories above
+FETCH_ALL_CACHE_KEYS = {
+    'tweets': lambda search_term, data: ResultCache.key('twitter', search_term, int(data.get('num_tweets', 10)), TWEET_EXTRACTION),
+    'youtube_videos': lambda search_term, data: ResultCache.key(
+        'youtube', search_term, int(data.get('num_videos', 10)), data.get('engine', YOUTUBE_ENGINE)),
+}
+FETCH_ALL_LANES = {
+    'tweets': lambda data: scrape_lanes('twitter'),
+    'youtube_videos': lambda data: scrape_lanes('youtube', data.get('engine', YOUTUBE_ENGINE)),
+}
 
 @app.route('/fetch-all', methods=['POST'])
 def fetch_all():
-    """Fetch both Twitter and YouTube data for a search term"""
+    """Fetch Twitter and YouTube data for a search term, scraping the platforms concurrently"""
     data = request.get_json()
     search_term = data.get('search_term', 'unknown')
-    num_tweets = int(data.get('num_tweets', 10))
-    num_videos = int(data.get('num_videos', 10))
+    timeout = number_param(data, 'timeout', FETCH_ALL_TIMEOUT)
+    if not resource_profile(data):
+        return profile_error()
     
-    scraper = SocialMediaScraper(TWITTER_USERNAME, TWITTER_PASSWORD)
+    scraper = get_scraper()
+    deadline = request_deadline(data)
+    # Platforms with a fresh cache entry are answered from it and need no admission slots
+    cached = {}
+    if use_result_cache(data):
+        for name, key in FETCH_ALL_CACHE_KEYS.items():
+            items = scraper.cache.fresh(key(search_term, data))
+            if items is not None:
+                cached[name] = items
+    lanes = [lane for name, lanes in FETCH_ALL_LANES.items() if name not in cached for lane in lanes(data)]
+    permit = admit_request(lanes, data)
+    sources = [
+        (name, lambda items=cached[name]: (item for item in items), timeout) if name in cached else
+        (name, lambda factory=factory: factory(scraper, search_term, data), timeout)
+        for name, factory in FETCH_ALL_PLATFORMS.items()
+    ]
+    fmt = stream_format(data)
+    if fmt:
+        return stream_items(iter_concurrently(sources, permit), fmt, use_typed_metrics(data), deadline)
     
-    results = {
-        'search_term': search_term,
-        'tweets': [],
-        'youtube_videos': []
-    }
-    
-    # Fetch Twitter data
-    try:
-        tweets = scraper.scrape_tweets(search_term, num_tweets)
-        if isinstance(tweets, list):
-            results['tweets'] = tweets
+    items = {name: [] for name in FETCH_ALL_PLATFORMS}
+    errors = {}
+    for name, item, error in iter_concurrently(sources, permit):
+        if error:
+            errors[name] = error
         else:
-            results['tweets'] = {"error": tweets.get("error", "Unknown Twitter error")}
-    except Exception as e:
-        results['tweets'] = {"error": str(e)}
+            items[name].append(item)
     
-    # Fetch YouTube data
-    try:
-        videos = scraper.scrape_youtube_videos(search_term, num_videos)
-        if isinstance(videos, list):
-            results['youtube_videos'] = videos
-        else:
-            results['youtube_videos'] = {"error": videos.get("error", "Unknown YouTube error")}
-    except Exception as e:
-        results['youtube_videos'] = {"error": str(e)}
+    results = {'search_term': search_term}
+    for name in FETCH_ALL_PLATFORMS:
+        results[name] = scrape_response(items[name], errors.get(name), deadline, data)
     
     return jsonify(results)
 
+def admit_job(job, platform, engine=YOUTUBE_ENGINE):
+    """Wait for the job's admission slots; None if the job is cancelled first
+
+    Jobs already sit in the bounded job queue, so they wait without a time limit.
+    """
+    def admit(lanes):
+        return ADMISSION.admit(lanes, job.params['priority'], timeout=None, bounded=False, cancel=job.cancel_event)
+    trace = current_trace()
+    if trace is not None:
+        trace.admitter = admit
+    return admit(scrape_lanes(platform, engine))
+
+def run_tweets_job(job):
+    params = job.params
+    permit = admit_job(job, 'twitter')
+    if permit is None:
+        return None
+    items = get_scraper().iter_tweets(params['search_term'], params['num_tweets'], params['extraction'], profile=params['profile'])
+    return AdmittedItems(permit, items)
+
+def run_youtube_videos_job(job):
+    params = job.params
+    permit = admit_job(job, 'youtube')
+    if permit is None:
+        return None
+    items = get_scraper().iter_youtube_videos(params['search_term'], params['num_videos'], profile=params['profile'])
+    return AdmittedItems(permit, items)
+
+def run_youtube_comments_job(job):
+    params = job.params
+    permit = admit_job(job, 'youtube')
+    if permit is None:
+        return None
+    items = get_scraper().iter_youtube_comments(params['video_url'], params['num_comments'], params['sort'], profile=params['profile'])
+    return AdmittedItems(permit, items)
+
+def run_all_job(job):
+    """Tweets then YouTube videos; a failure on one side is recorded and the other still runs"""
+    scraper = get_scraper()
+    params = job.params
+    sources = [
+        ('tweets', 'twitter', lambda: scraper.iter_tweets(params['search_term'], params['num_tweets'], params['extraction'], profile=params['profile'])),
+        ('youtube_videos', 'youtube', lambda: scraper.iter_youtube_videos(params['search_term'], params['num_videos'], profile=params['profile'])),
+    ]
+    for name, platform, source in sources:
+        if job.cancel_event.is_set():
+            return
+        permit = admit_job(job, platform)
+        if permit is None:
+            return
+        items = AdmittedItems(permit, source())
+        try:
+            for item in items:
+                yield item
+        except Exception as e:
+            job.add_error(name, str(e))
+        finally:
+            items.close()
+
+def job_params(data):
+    return {
+        'search_term': data.get('search_term', 'unknown'),
+        'num_tweets': int(data.get('num_tweets', 10)),
+        'num_videos': int(data.get('num_videos', 10)),
+        'num_comments': int(data.get('num_comments', 50)),
+        'video_url': data.get('video_url', ''),
+        'sort': data.get('sort', 'top'),
+        'extraction': data.get('extraction', TWEET_EXTRACTION),
+        'profile': resource_profile(data),
+        'priority': request_priority(data, default='bulk'),
+    }
+
+JOB_TYPES = {
+    'tweets': run_tweets_job,
+    'youtube_videos': run_youtube_videos_job,
+    'youtube_comments': run_youtube_comments_job,
+    'all': run_all_job,
+}
+
+_job_manager = None
+_watchlist = None
+
+def get_job_manager():
+    global _job_manager
+    with _scraper_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
+
+def get_watchlist():
+    global _watchlist
+    with _scraper_lock:
+        if _watchlist is None:
+            _watchlist = Watchlist()
+        return _watchlist
+
+def run_watch_poll(job):
+    """One watchlist poll: yields the items newer than the watch's high-water mark"""
+    watchlist = get_watchlist()
+    watch = watchlist.get(job.params['watch_id'])
+    if watch is None:
+        return
+    new_items = []
+    error = None
+    try:
+        permit = admit_job(job, watch.platform, watch.engine)
+        if permit is None:
+            return
+        items = AdmittedItems(permit, watchlist.source(watch))
+        try:
+            for item in items:
+                if watch.is_known(item):
+                    break
+                new_items.append(item)
+                yield item
+        finally:
+            items.close()
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        watchlist.finish(watch, new_items, error)
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """Queue a scrape and return its job id immediately"""
+    data = request.get_json() or {}
+    job_type = data.get('type', '')
+    if job_type not in JOB_TYPES:
+        return jsonify({"error": f"type must be one of: {', '.join(JOB_TYPES)}"}), 400
+    params = job_params(data)
+    if job_type == 'youtube_comments' and not params['video_url']:
+        return jsonify({"error": "video_url is required"}), 400
+    if not params['profile']:
+        return profile_error(), 400
+
+    try:
+        job = get_job_manager().submit(job_type, params, JOB_TYPES[job_type])
+    except JobQueueFull as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({'job_id': job.id, 'status': job.status}), 202
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Job status, progress count and (partial) results"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    include_results = request.args.get('results', 'true').lower() != 'false'
+    result = job.to_dict(include_results)
+    if include_results and job.type == 'all':
+        items = result.pop('results')
+        result['results'] = {
+            'search_term': job.params['search_term'],
+            'tweets': shape_items([item for item in items if item['platform'] == 'twitter'], request.args),
+            'youtube_videos': shape_items([item for item in items if item['platform'] == 'youtube'], request.args),
+        }
+    elif include_results:
+        result['results'] = shape_items(result['results'], request.args)
+    return jsonify(result)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued or running job; results gathered so far are kept"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job.to_dict(include_results=False))
+
+@app.route('/watchlist', methods=['POST'])
+def create_watch():
+    """Watch a search term: poll it every interval seconds and deliver only the new items"""
+    data = request.get_json() or {}
+    platform = data.get('platform', 'twitter')
+    if platform not in WATCH_PLATFORMS:
+        return jsonify({"error": f"platform must be one of: {', '.join(WATCH_PLATFORMS)}"}), 400
+    search_term = str(data.get('search_term') or '').strip()
+    if not search_term:
+        return jsonify({"error": "search_term is required"}), 400
+    interval = float(data.get('interval', 900))
+    if interval < WATCH_MIN_INTERVAL:
+        return jsonify({"error": f"interval must be at least {WATCH_MIN_INTERVAL:g} seconds"}), 400
+    profile = resource_profile(data)
+    if not profile:
+        return profile_error(), 400
+
+    watch = Watch(
+        platform=platform,
+        search_term=search_term,
+        interval=interval,
+        max_items=int(data.get('max_items', WATCH_MAX_ITEMS)),
+        webhook=data.get('webhook', ''),
+        extraction=data.get('extraction', TWEET_EXTRACTION),
+        profile=profile,
+        engine=data.get('engine', YOUTUBE_ENGINE),
+    )
+    get_watchlist().add(watch)
+    return jsonify(watch.to_dict()), 201
+
+@app.route('/watchlist', methods=['GET'])
+def list_watches():
+    return jsonify([watch.to_dict() for watch in get_watchlist().list()])
+
+@app.route('/watchlist/events', methods=['GET'])
+def watch_events():
+    """Take queued deliveries (new items of watches without a webhook), oldest first"""
+    limit = int(request.args.get('limit', 100))
+    return jsonify({'events': get_watchlist().drain_events(limit)})
+
+@app.route('/watchlist/<watch_id>', methods=['GET'])
+def get_watch(watch_id):
+    watch = get_watchlist().get(watch_id)
+    if watch is None:
+        return jsonify({"error": "watch not found"}), 404
+    return jsonify(watch.to_dict())
+
+@app.route('/watchlist/<watch_id>', methods=['DELETE'])
+def delete_watch(watch_id):
+    """Stop watching; a poll already running still delivers its items"""
+    watch = get_watchlist().remove(watch_id)
+    if watch is None:
+        return jsonify({"error": "watch not found"}), 404
+    return jsonify(watch.to_dict())
+
+def pool_gauge():
+    if _scraper is None:
+        return {}
+    stats = _scraper.pool.stats()
+    values = {('busy',): stats['busy'], ('total',): stats['size'], ('max',): stats['max_size']}
+    values[('idle',)] = sum(stats['idle'].values())
+    return values
+
+def cache_gauge():
+    if _scraper is None:
+        return {}
+    stats = _scraper.cache.stats()
+    return {('entries',): stats['entries'], ('bytes',): stats['bytes']}
+
+def job_queue_gauge():
+    return {(): _job_manager.queue_depth() if _job_manager else 0}
+
+def admission_gauge():
+    values = {}
+    for name, stats in ADMISSION.stats().items():
+        for state in ('capacity', 'in_use', 'queued'):
+            values[(name, state)] = stats[state]
+    return values
+
+METRICS.register(Gauge('scraper_driver_pool', 'Browsers in the driver pool', ('state',), pool_gauge))
+METRICS.register(Gauge('scraper_result_cache', 'Result cache size', ('measure',), cache_gauge))
+METRICS.register(Gauge('scraper_job_queue_depth', 'Jobs waiting for a worker', (), job_queue_gauge))
+METRICS.register(Gauge('scraper_admission', 'Admission lane slots', ('lane', 'state'), admission_gauge))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of the scraper metrics"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 once a browser has started, 503 until then"""
+    body = {'ready': _readiness['ready']}
+    if _readiness['ready']:
+        body['ready_for_seconds'] = round(time.time() - _readiness['since'], 1)
+    elif _readiness['error']:
+        body['error'] = _readiness['error']
+    return jsonify(body), 200 if _readiness['ready'] else 503
+
+@app.route('/admission-stats', methods=['GET'])
+def admission_stats():
+    """Slots in use, waiters and rejections per admission lane"""
+    return jsonify(ADMISSION.stats())
+
+@app.route('/search-stored', methods=['GET'])
+def search_stored():
+    """Query previously scraped items by keyword, platform and time range, without scraping
+
+    q: words that must all appear (tweet text, video title, comment text or author),
+    platform: twitter, youtube or youtube_comment, since/until: ISO-8601 or epoch seconds.
+    """
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "the result store is disabled (STORE_PATH is empty)"}), 404
+    args = request.args
+    platform = args.get('platform') or None
+    if platform and platform not in TYPED_FIELDS:
+        return jsonify({"error": f"platform must be one of: {', '.join(TYPED_FIELDS)}"}), 400
+    bounds = {}
+    for name in ('since', 'until'):
+        bounds[name] = parse_timestamp(args.get(name))
+        if args.get(name) and bounds[name] is None:
+            return jsonify({"error": f"{name} must be an ISO-8601 time or epoch seconds"}), 400
+    try:
+        limit = max(1, min(int(args.get('limit', 50)), STORE_SEARCH_MAX_LIMIT))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    items = store.search(args.get('q', '').strip(), platform, bounds['since'], bounds['until'], limit)
+    return jsonify({'count': len(items), 'results': shape_items(items, args)})
+
+@app.route('/store-stats', methods=['GET'])
+def store_stats():
+    """Stored item counts per platform and writer queue state"""
+    store = get_store()
+    if store is None:
+        return jsonify({"error": "the result store is disabled (STORE_PATH is empty)"}), 404
+    return jsonify(store.stats())
+
+@app.route('/cache-stats', methods=['GET'])
+def cache_stats():
+    """Result cache hit/miss counters and size"""
+    return jsonify(get_scraper().cache.stats())
+
+@app.route('/selector-stats', methods=['GET'])
+def selector_stats():
+    """Hit/miss counts and current order of the YouTube selector cascades"""
+    return jsonify(get_scraper().youtube_plan.stats())
+
 if __name__ == '__main__':
+    if PREWARM_ON_START:
+        prewarm_in_background()
+    # Resume saved watches
+    if os.path.exists(WATCHLIST_FILE):
+        get_watchlist()
     app.run(host='0.0.0.0',debug=False, port=5000)
\ No newline at end of file
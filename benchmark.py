@@ -0,0 +1,493 @@
+"""Offline benchmark for the scrapers in app.py
+
+Serves local stand-ins for X search, YouTube search and a YouTube watch page (same
+markup and JSON shapes the scrapers read, see benchmark_fixtures/), runs the Flask
+routes against them and reports items/second, WebDriver round trips per item,
+p50/p95 request latency and peak browser memory.
+
+    python benchmark.py --items 200 --runs 3 --latency 150
+    python benchmark.py --scenarios youtube_videos --engine http --compare benchmark_results/old.json
+    python benchmark.py --serve          # only run the stand-in server
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_fixtures')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_results')
+FEED_START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+VIDEO_ID = 'benchVideo1'
+
+# 1x1 transparent GIF served for every thumbnail
+PIXEL = (b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00'
+         b',\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;')
+
+
+class FixtureFeed:
+    """Deterministic, paged content for the stand-in pages"""
+
+    def __init__(self, page_size=20, feed_size=5000):
+        self.page_size = page_size
+        self.feed_size = feed_size
+
+    def page_range(self, page):
+        start = page * self.page_size
+        return range(start, min(start + self.page_size, self.feed_size))
+
+    def has_more(self, page):
+        return (page + 1) * self.page_size < self.feed_size
+
+    def tweet(self, index):
+        # Newest first, so ids go down as the feed goes on
+        tweet_id = str(10 ** 12 - index)
+        created = FEED_START - timedelta(minutes=index)
+        return {
+            'entryId': f'tweet-{tweet_id}',
+            'content': {'itemContent': {'tweet_results': {'result': {
+                '__typename': 'Tweet',
+                'rest_id': tweet_id,
+                'core': {'user_results': {'result': {'core': {'screen_name': f'bench_user{index % 50}'}}}},
+                'views': {'count': str(1000 + index * 7)},
+                'legacy': {
+                    'id_str': tweet_id,
+                    'full_text': f'Benchmark tweet {index} about scraping and infinite scroll',
+                    'created_at': created.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+                    'favorite_count': index * 3 % 5000,
+                    'retweet_count': index % 97,
+                    'reply_count': index % 13,
+                },
+            }}}},
+        }
+
+    def timeline(self, query, cursor):
+        """SearchTimeline response; max_id: in the query skips to older tweets"""
+        start = 0
+        for term in query.split():
+            if term.startswith('max_id:') and term[7:].isdigit():
+                start = max(0, 10 ** 12 - int(term[7:]))
+        page = int(cursor) if cursor.isdigit() else 0
+        first = start + page * self.page_size
+        entries = [self.tweet(i) for i in range(first, min(first + self.page_size, self.feed_size))]
+        if first + self.page_size < self.feed_size:
+            entries.append({'entryId': f'cursor-bottom-{page + 1}', 'content': {'value': str(page + 1)}})
+        return {'data': {'search_by_raw_query': {'search_timeline': {'timeline': {'instructions': [
+            {'type': 'TimelineAddEntries', 'entries': entries}
+        ]}}}}}
+
+    @staticmethod
+    def continuation(token):
+        return {'continuationItemRenderer': {'continuationEndpoint': {'continuationCommand': {'token': token}}}}
+
+    def video(self, index, base_url):
+        video_id = f'v{index:010d}'
+        return {'videoRenderer': {
+            'videoId': video_id,
+            'title': {'runs': [{'text': f'Benchmark video number {index}'}]},
+            'ownerText': {'runs': [{'text': f'Bench Channel {index % 20}'}]},
+            'shortViewCountText': {'simpleText': f'{(index * 37) % 900 + 1}K views'},
+            'publishedTimeText': {'simpleText': f'{index % 11 + 1} days ago'},
+            'lengthText': {'simpleText': f'{index % 50}:{index % 60:02d}'},
+            'thumbnail': {'thumbnails': [{'url': f'{base_url}/i.ytimg.com/vi/{video_id}/hqdefault.jpg'}]},
+            'descriptionSnippet': {'runs': [{'text': f'Description of video {index}'}]},
+        }}
+
+    def search_items(self, page, base_url):
+        items = [{'itemSectionRenderer': {'contents': [self.video(i, base_url) for i in self.page_range(page)]}}]
+        if self.has_more(page):
+            items.append(self.continuation(f'search-{page + 1}'))
+        return items
+
+    def search_page_data(self, base_url):
+        return {'contents': {'twoColumnSearchResultsRenderer': {'primaryContents': {'sectionListRenderer': {
+            'contents': self.search_items(0, base_url)
+        }}}}}
+
+    def search_continuation(self, page, base_url):
+        return {'onResponseReceivedCommands': [{'appendContinuationItemsAction': {
+            'continuationItems': self.search_items(page, base_url)
+        }}]}
+
+    def comment(self, index):
+        return {'commentThreadRenderer': {'comment': {'commentRenderer': {
+            'commentId': f'bench-comment-{index}',
+            'contentText': {'runs': [{'text': f'Benchmark comment {index}'}]},
+            'authorText': {'simpleText': f'@bench_viewer{index % 40}'},
+            'voteCount': {'simpleText': str(index * 11 % 2000)},
+            'publishedTimeText': {'runs': [{'text': f'{index % 23 + 1} hours ago'}]},
+        }}}}
+
+    def watch_page_data(self):
+        return {'contents': {'twoColumnWatchNextResults': {'results': {'results': {'contents': [
+            {'itemSectionRenderer': {'sectionIdentifier': 'comment-item-section',
+                                     'contents': [self.continuation('comments-first')]}}
+        ]}}}}}
+
+    def comments_continuation(self, token):
+        if token == 'comments-first':
+            header = {'commentsHeaderRenderer': {'sortMenu': {'sortFilterSubMenuRenderer': {'subMenuItems': [
+                {'serviceEndpoint': {'continuationCommand': {'token': 'comments-0'}}},
+                {'serviceEndpoint': {'continuationCommand': {'token': 'comments-0'}}},
+            ]}}}}
+            return {'onResponseReceivedEndpoints': [
+                {'reloadContinuationItemsCommand': {'continuationItems': [header]}},
+                {'reloadContinuationItemsCommand': {'continuationItems': self.comment_items(0)}},
+            ]}
+        page = int(token.rsplit('-', 1)[1])
+        return {'onResponseReceivedEndpoints': [
+            {'appendContinuationItemsAction': {'continuationItems': self.comment_items(page)}}
+        ]}
+
+    def comment_items(self, page):
+        items = [self.comment(i) for i in self.page_range(page)]
+        if self.has_more(page):
+            items.append(self.continuation(f'comments-{page + 1}'))
+        return items
+
+
+def make_handler(feed, latency_ms, jitter_ms):
+    """Request handler serving the fixture pages; API responses are delayed by the configured latency"""
+    templates = {}
+    for name in ('twitter_login', 'twitter_search', 'youtube_results', 'youtube_watch'):
+        with open(os.path.join(FIXTURES_DIR, f'{name}.html'), encoding='utf-8') as f:
+            templates[name] = f.read()
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def base_url(self):
+            return f"http://{self.headers.get('Host')}"
+
+        def delay(self):
+            if latency_ms or jitter_ms:
+                time.sleep(max(0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        def send(self, body, content_type='text/html; charset=utf-8', status=200):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            # Lets twitter_login() and the session check succeed against the stand-in
+            self.send_header('Set-Cookie', 'auth_token=benchmark; Path=/; Max-Age=86400')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, payload):
+            self.delay()
+            self.send(json.dumps(payload), 'application/json')
+
+        def page(self, name, initial_data=None):
+            self.delay()
+            html = templates[name]
+            if initial_data is not None:
+                html = html.replace('{{YT_INITIAL_DATA}}', json.dumps(initial_data))
+            self.send(html)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path in ('/login', '/i/flow/login'):
+                self.page('twitter_login')
+            elif url.path == '/robots.txt':
+                self.send('User-agent: *\n', 'text/plain')
+            elif url.path == '/search':
+                self.page('twitter_search')
+            elif url.path.endswith('/SearchTimeline'):
+                self.send_json(feed.timeline(query.get('q', [''])[0], query.get('cursor', [''])[0]))
+            elif url.path == '/results':
+                self.page('youtube_results', feed.search_page_data(self.base_url()))
+            elif url.path == '/watch':
+                self.page('youtube_watch', feed.watch_page_data())
+            elif url.path.startswith('/i.ytimg.com/'):
+                self.send(PIXEL, 'image/gif')
+            else:
+                self.send('Not found', 'text/plain', status=404)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            token = body.get('continuation', '')
+            path = urlparse(self.path).path
+            if path == '/youtubei/v1/search' and token.startswith('search-'):
+                self.send_json(feed.search_continuation(int(token.split('-')[1]), self.base_url()))
+            elif path == '/youtubei/v1/next' and token.startswith('comments-'):
+                self.send_json(feed.comments_continuation(token))
+            else:
+                self.send('Not found', 'text/plain', status=404)
+
+    return FixtureHandler
+
+
+def start_server(feed, latency_ms=0, jitter_ms=0, port=0):
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(feed, latency_ms, jitter_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class CommandCounter:
+    """Counts WebDriver commands (each one is an HTTP round trip to chromedriver)"""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def install(self):
+        from selenium.webdriver.remote.webdriver import WebDriver
+        original = WebDriver.execute
+        counter = self
+
+        def execute(driver, driver_command, params=None):
+            with counter.lock:
+                counter.count += 1
+            return original(driver, driver_command, params)
+
+        WebDriver.execute = execute
+
+    def reset(self):
+        with self.lock:
+            count, self.count = self.count, 0
+        return count
+
+
+def process_tree_rss_mb(root_pid):
+    """Resident memory of every descendant of root_pid (the browsers and chromedriver), in MB"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name is in parentheses and may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    stack = list(children.get(root_pid, []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
+
+class MemorySampler:
+    """Samples browser memory in the background and keeps the peak"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        pid = os.getpid()
+        while not self._stop.is_set():
+            try:
+                self.peak_mb = max(self.peak_mb, process_tree_rss_mb(pid))
+            except OSError:
+                pass
+            self._stop.wait(self.interval)
+
+
+def percentile(values, fraction):
+    """Linear-interpolated percentile of values (fraction in 0..1)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+# scenario -> (route, request body)
+def scenario_requests(args, base_url):
+    common = {'cache': False, 'profile': args.profile}
+    return {
+        'tweets': ('/fetch-tweets', dict(common, search_term='benchmark', num_tweets=args.items,
+                                         extraction=args.extraction)),
+        'youtube_videos': ('/fetch-youtube-videos', dict(common, search_term='benchmark', num_videos=args.items,
+                                                         engine=args.engine)),
+        'youtube_comments': ('/fetch-youtube-comments', dict(common, video_url=f'{base_url}/watch?v={VIDEO_ID}',
+                                                             num_comments=args.items, engine=args.engine)),
+    }
+
+
+def run_scenario(client, counter, route, body, runs, warmup):
+    latencies = []
+    items = 0
+    round_trips = 0
+    errors = []
+    with MemorySampler() as memory:
+        for run in range(warmup + runs):
+            counter.reset()
+            started = time.perf_counter()
+            response = client.post(route, json=body)
+            elapsed = time.perf_counter() - started
+            commands = counter.reset()
+            result = response.get_json()
+            # An unhandled failure answers with an HTML error page, not JSON
+            if not 200 <= response.status_code < 300:
+                detail = result.get('error') if isinstance(result, dict) else None
+                errors.append(f"HTTP {response.status_code}: {detail}" if detail else f"HTTP {response.status_code}")
+                continue
+            if result is None:
+                errors.append("response was not JSON")
+                continue
+            if isinstance(result, dict) and 'error' in result:
+                errors.append(result['error'])
+                continue
+            if run < warmup:
+                continue
+            latencies.append(elapsed)
+            # Requests with a deadline answer with a {results, truncated, reason} envelope
+            items += len(result['results']) if isinstance(result, dict) and 'results' in result else len(result)
+            round_trips += commands
+
+    total_time = sum(latencies)
+    return {
+        'runs': len(latencies),
+        'items': items,
+        'items_per_second': items / total_time if total_time else 0,
+        'round_trips_per_item': round_trips / items if items else None,
+        'latency_p50_s': percentile(latencies, 0.5),
+        'latency_p95_s': percentile(latencies, 0.95),
+        'peak_browser_memory_mb': round(memory.peak_mb, 1),
+        'errors': errors,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline):
+    """Print each metric next to the baseline run's value"""
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')}):")
+    for name, result in current['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        print(f"  {name}")
+        for metric in ('items_per_second', 'round_trips_per_item', 'latency_p50_s', 'latency_p95_s',
+                       'peak_browser_memory_mb'):
+            old, new = before.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+            print(f"    {metric:24} {old:10.3f} -> {new:10.3f}  ({change})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', default='tweets,youtube_videos,youtube_comments',
+                        help='comma-separated: tweets, youtube_videos, youtube_comments')
+    parser.add_argument('--items', type=int, default=100, help='items requested per run')
+    parser.add_argument('--runs', type=int, default=3, help='measured runs per scenario')
+    parser.add_argument('--warmup', type=int, default=1, help='unmeasured runs first (browser launch, login)')
+    parser.add_argument('--latency', type=float, default=100, help='ms added to every page and API response')
+    parser.add_argument('--jitter', type=float, default=0, help='+/- ms of random latency')
+    parser.add_argument('--page-size', type=int, default=20, help='items per feed page')
+    parser.add_argument('--extraction', default='batch', help='tweet extraction mode')
+    parser.add_argument('--engine', default='browser', help='YouTube engine (browser, http, auto)')
+    parser.add_argument('--profile', default='full', help='resource profile')
+    parser.add_argument('--output', help='results file (default benchmark_results/<timestamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--serve', action='store_true', help='only run the stand-in server')
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args()
+
+    feed = FixtureFeed(page_size=args.page_size, feed_size=max(5000, args.items * 2))
+    server = start_server(feed, args.latency, args.jitter, args.port)
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    if args.serve:
+        print(f"Stand-in server on {base_url} (/search?q=..., /results?search_query=..., /watch?v={VIDEO_ID})")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            return
+
+    # app reads these at import time; the session file keeps the real one untouched,
+    # and stand-in items are kept out of the result store
+    session_dir = tempfile.mkdtemp(prefix='benchmark-')
+    os.environ['TWITTER_BASE_URL'] = base_url
+    os.environ['YOUTUBE_BASE_URL'] = base_url
+    os.environ['TWITTER_SESSION_FILE'] = os.path.join(session_dir, 'twitter_session.json')
+    os.environ['STORE_PATH'] = ''
+    import app
+
+    counter = CommandCounter()
+    counter.install()
+    client = app.app.test_client()
+    requests = scenario_requests(args, base_url)
+
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'serve')},
+        'scenarios': {},
+    }
+    try:
+        for name in [name.strip() for name in args.scenarios.split(',') if name.strip()]:
+            if name not in requests:
+                parser.error(f"unknown scenario: {name}")
+            route, body = requests[name]
+            print(f"Running {name} ({args.runs} x {args.items} items, {args.latency:g} ms latency)...")
+            result = run_scenario(client, counter, route, body, args.runs, args.warmup)
+            results['scenarios'][name] = result
+            print(f"  {result['items_per_second']:.1f} items/s, "
+                  f"{result['round_trips_per_item'] or 0:.2f} round trips/item, "
+                  f"p50 {result['latency_p50_s'] or 0:.2f}s, p95 {result['latency_p95_s'] or 0:.2f}s, "
+                  f"peak browser memory {result['peak_browser_memory_mb']:.0f} MB"
+                  + (f", {len(result['errors'])} errors" if result['errors'] else ''))
+    finally:
+        if app._scraper:
+            app._scraper.pool.close()
+        server.shutdown()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()